@@ -0,0 +1,106 @@
+"""Parity check and benchmarks for the pure-NumPy pipeline evaluator.
+
+Exports the pickled pipeline, verifies that ``CompiledPipeline.predict_proba``
+is bit-for-bit identical to the original ``predict_proba`` (including rows with
+missing values), then times single-row latency and batch throughput.
+
+Usage: python benchmarks/bench_compiled_model.py [--rows 1000000]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.compiled_model import export_pipeline  # noqa: E402
+from core.features import engineer_features  # noqa: E402
+from core.model_registry import DEFAULT_MODEL_PATH, load_model  # noqa: E402
+
+
+def make_data(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "income": rng.uniform(20000, 200000, rows),
+        "credit_score": rng.uniform(250, 900, rows),
+        "loan_amount": rng.uniform(0, 60000, rows),
+        "years_employed": rng.uniform(0, 45, rows),
+        "points": rng.uniform(0, 100, rows),
+    })
+    for i, column in enumerate(df.columns):
+        df.iloc[i::97, i] = np.nan
+    return engineer_features(df)
+
+
+def check_parity(pipeline, compiled, frames):
+    for name, frame in frames:
+        expected = pipeline.predict_proba(frame)
+        actual = compiled.predict_proba(frame)
+        if expected.dtype != actual.dtype or not np.array_equal(expected, actual):
+            mismatches = int((expected != actual).any(axis=1).sum())
+            raise SystemExit(f"parity FAILED on {name}: {mismatches} rows differ")
+        print(f"parity ok:   {name} ({len(frame):,} rows, bit-for-bit)")
+
+
+def latency(func, frame, calls=500):
+    timings = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        func(frame)
+        timings[i] = time.perf_counter() - start
+    return np.percentile(timings, [50, 99]) * 1e6
+
+
+def throughput(func, frame):
+    start = time.perf_counter()
+    func(frame)
+    return len(frame) / (time.perf_counter() - start)
+
+
+def import_time(statement):
+    code = f"import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=os.path.join(ROOT, DEFAULT_MODEL_PATH))
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    pipeline = load_model(args.model)
+    compiled = export_pipeline(pipeline)
+    sample = engineer_features(pd.read_csv(os.path.join(ROOT, "data.csv")))
+    batch = make_data(args.rows)
+    check_parity(pipeline, compiled, [("data.csv", sample), ("synthetic", batch)])
+
+    single = sample.iloc[:1]
+    print()
+    print(f"{'':12}{'pipeline':>14}{'compiled':>14}")
+    p50_a, p99_a = latency(pipeline.predict_proba, single)
+    p50_b, p99_b = latency(compiled.predict_proba, single)
+    print(f"{'1 row p50':12}{p50_a:11.1f} us{p50_b:11.1f} us")
+    print(f"{'1 row p99':12}{p99_a:11.1f} us{p99_b:11.1f} us")
+    rate_a = throughput(pipeline.predict_proba, batch)
+    rate_b = throughput(compiled.predict_proba, batch)
+    print(f"{'rows/s':12}{rate_a:14,.0f}{rate_b:14,.0f}")
+
+    cold_a = import_time(f"import joblib; joblib.load({args.model!r})")
+    npz = os.path.join(ROOT, "bench_compiled_model.npz")
+    compiled.save(npz)
+    try:
+        cold_b = import_time(f"from core.compiled_model import CompiledPipeline; CompiledPipeline.load({npz!r})")
+    finally:
+        os.remove(npz)
+    print(f"{'cold load':12}{cold_a * 1000:11.1f} ms{cold_b * 1000:11.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
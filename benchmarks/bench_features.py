@@ -0,0 +1,100 @@
+"""Benchmark vectorized feature engineering against the old ``Series.apply`` code.
+
+Usage: python benchmarks/bench_features.py [--rows 1000000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.features import INPUT_COLUMNS, MODEL_COLUMNS, engineer_features  # noqa: E402
+
+
+# The per-row implementation previously defined in pages/2_Deployment_Data.py.
+def create_income_group(x):
+    if x < 61000:
+        return 0
+    elif x < 91000:
+        return 1
+    elif x < 120000:
+        return 2
+    else:
+        return 3
+
+
+def create_credit_group(x):
+    if x < 579:
+        return 0
+    elif x < 669:
+        return 1
+    elif x < 740:
+        return 2
+    else:
+        return 3
+
+
+def create_points_group(x):
+    if x < 30:
+        return 0
+    elif x < 65:
+        return 1
+    else:
+        return 2
+
+
+def apply_features(df):
+    df = df[INPUT_COLUMNS].copy()
+    df["income_score_group"] = df["income"].apply(create_income_group)
+    df["credit_score_group"] = df["credit_score"].apply(create_credit_group)
+    df["points_score_group"] = df["points"].apply(create_points_group)
+    return df[MODEL_COLUMNS]
+
+
+def make_data(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "income": rng.integers(30000, 150001, rows).astype(np.float64),
+        "credit_score": rng.integers(300, 851, rows).astype(np.float64),
+        "loan_amount": rng.integers(1000, 50001, rows).astype(np.float64),
+        "years_employed": rng.integers(0, 41, rows).astype(np.float64),
+        "points": rng.integers(0, 101, rows).astype(np.float64),
+    })
+
+
+def best_of(func, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_data(args.rows)
+    expected = apply_features(df)
+    actual = engineer_features(df)
+    for column in MODEL_COLUMNS:
+        if not np.array_equal(expected[column].to_numpy(), actual[column].to_numpy()):
+            raise SystemExit(f"mismatch in column {column!r}")
+
+    apply_time = best_of(apply_features, df, args.repeat)
+    vector_time = best_of(engineer_features, df, args.repeat)
+    print(f"rows:        {args.rows:,}")
+    print(f".apply:      {apply_time * 1000:10.1f} ms")
+    print(f"vectorized:  {vector_time * 1000:10.1f} ms")
+    print(f"speed-up:    {apply_time / vector_time:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Scaling benchmark for shared-memory parallel batch scoring.
+
+Usage: python benchmarks/bench_parallel.py [--rows 2000000] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_features import make_data  # noqa: E402
+from core.features import engineer_features  # noqa: E402
+from core.model_registry import load_model, resolve_model_path  # noqa: E402
+from core.parallel import ParallelScorer, default_thread_budget  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=None, help="defaults to the newest of the .pkl/.npz artifacts")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--thread-budget", type=int, default=default_thread_budget())
+    args = parser.parse_args()
+
+    model_path = args.model or os.path.join(ROOT, resolve_model_path(
+        os.path.join(ROOT, "loan_approval_pipeline.pkl"), os.path.join(ROOT, "loan_approval_pipeline.npz")))
+    features = engineer_features(make_data(args.rows))
+    serial_model = load_model(model_path)
+
+    start = time.perf_counter()
+    expected = serial_model.predict_proba(features)
+    serial = time.perf_counter() - start
+    print(f"model:         {os.path.basename(model_path)}")
+    print(f"rows:          {args.rows:,}   thread budget: {args.thread_budget}")
+    print(f"in-process:    {serial:7.2f} s  {args.rows / serial:12,.0f} rows/s")
+
+    for workers in args.workers:
+        scorer = ParallelScorer(model_path, workers, args.thread_budget)
+        try:
+            scorer.warm_up()
+            start = time.perf_counter()
+            actual = scorer.predict_proba(features)
+            elapsed = time.perf_counter() - start
+        finally:
+            scorer.shutdown()
+        if not np.allclose(actual, expected):
+            raise SystemExit(f"{workers} workers: results differ from in-process scoring")
+        print(f"{workers} worker(s):   {elapsed:7.2f} s  {args.rows / elapsed:12,.0f} rows/s  "
+              f"speed-up {serial / elapsed:4.2f}x  ({scorer.threads_per_worker} thread(s) each)")
+
+
+if __name__ == "__main__":
+    main()
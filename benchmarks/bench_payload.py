@@ -0,0 +1,154 @@
+"""Measure the Plotly payloads of the dashboard charts before and after compaction.
+
+Builds every Plotly chart of the visualization and correlation pages the way
+the pages do, from a reference dataset made by tiling data.csv to ``--rows``
+rows, and reports for each:
+
+* payload bytes of the JSON sent to the browser, raw and gzip-compressed
+  (the websocket compresses messages with deflate);
+* the server time to build and serialize the figure, with and without
+  compaction;
+* that every compacted data array matches the original to float32 precision.
+
+Client render time needs a browser, which this script does not drive. With
+``--html DIR`` it writes a before/after HTML page per chart that times
+``Plotly.newPlot`` with ``performance.now()`` and shows the result at the top
+of the page; open them in a browser to read the render times.
+
+Usage: python benchmarks/bench_payload.py [--rows 1000000] [--html payload_pages]
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from core.correlation import correlation_matrix  # noqa: E402
+from core.cube import donut_figure, get_cube  # noqa: E402
+from core.derived import with_groups  # noqa: E402
+from core.density import density_figure, scatter_density  # noqa: E402
+from core.ingest import read_loan_csv  # noqa: E402
+from core.payload import _decode, compact_figure  # noqa: E402
+from core.violin import violin_figure, violin_summaries  # noqa: E402
+
+RENDER_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{name}</title><script src="plotly.min.js"></script></head>
+<body>
+<pre id="timing">rendering...</pre>
+<div id="chart"></div>
+<script>
+var fig = {spec};
+var started = performance.now();
+Plotly.newPlot("chart", fig.data, fig.layout).then(function () {{
+    var ms = performance.now() - started;
+    document.getElementById("timing").textContent = "{name}: " + ms.toFixed(1) + " ms";
+    document.title = ms.toFixed(1) + " ms";
+}});
+</script>
+</body>
+</html>
+"""
+
+
+def make_data(rows):
+    sample = read_loan_csv(os.path.join(ROOT, "data.csv"))
+    return sample.iloc[np.resize(np.arange(len(sample)), rows)].reset_index(drop=True)
+
+
+def build_figures(data):
+    import plotly.express as px
+
+    hover_columns = data.columns.tolist()[:5]
+    grid, sample = scatter_density(data, "income", "credit_score", weight_column="loan_approved")
+    summaries, _ = violin_summaries(data, "loan_approved", "income")
+    matrix, _ = correlation_matrix(data)
+    yield "scatter (WebGL points)", lambda: px.scatter(
+        data, x="income", y="credit_score", color="points", hover_data=hover_columns,
+        template="plotly_dark", color_continuous_scale="Viridis", render_mode="webgl"
+    )
+    yield "scatter (density grid)", lambda: density_figure(grid, sample, "income", "credit_score", hover_columns)
+    yield "violin", lambda: violin_figure(summaries, "loan_approved", "income")
+    yield "donut", lambda: donut_figure(get_cube(None, data).counts_by("credit_score_group"), "credit_score_group")
+    yield "correlation heatmap", lambda: px.imshow(
+        matrix, text_auto=".2f", zmin=-1, zmax=1, color_continuous_scale="RdBu", template="plotly_dark"
+    )
+
+
+def _arrays(node, path=()):
+    for key, value in node.items():
+        if isinstance(value, dict) and "bdata" not in value:
+            yield from _arrays(value, path + (key,))
+        else:
+            array = _decode(value)
+            if array is not None:
+                yield path + (key,), array
+
+
+def check_parity(name, before, after):
+    """Fail unless every compacted data array equals its original to float32 precision."""
+    for trace_before, trace_after in zip(before["data"], after["data"]):
+        compacted = dict(_arrays(trace_after))
+        for path, original in _arrays(trace_before):
+            actual = compacted.get(path)
+            if actual is None or not np.allclose(
+                actual.astype(np.float64), original.astype(np.float64), rtol=1e-6, equal_nan=True
+            ):
+                raise SystemExit(f"{name}: data array {'.'.join(path)} changed")
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--html", default=None, help="directory for before/after render-timing pages")
+    args = parser.parse_args()
+
+    data = with_groups(None, make_data(args.rows))
+    if args.html:
+        from plotly.offline import get_plotlyjs
+
+        os.makedirs(args.html, exist_ok=True)
+        with open(os.path.join(args.html, "plotly.min.js"), "w", encoding="utf-8") as fh:
+            fh.write(get_plotlyjs())
+
+    print(f"rows: {len(data):,}")
+    print(f"{'chart':<24}{'before':>12}{'after':>12}{'gzip before':>14}{'gzip after':>13}{'ratio':>8}"
+          f"{'build before':>14}{'build after':>13}")
+    totals = np.zeros(4)
+    for name, build in build_figures(data):
+        before, before_seconds = timed(lambda: build().to_json())
+        after, after_seconds = timed(lambda: compact_figure(build()).to_json())
+        check_parity(name, json.loads(before), json.loads(after))
+        sizes = np.array([len(before), len(after), len(gzip.compress(before.encode())),
+                          len(gzip.compress(after.encode()))])
+        totals += sizes
+        print(f"{name:<24}{sizes[0] / 1e3:>10,.0f}kB{sizes[1] / 1e3:>10,.0f}kB{sizes[2] / 1e3:>12,.0f}kB"
+              f"{sizes[3] / 1e3:>11,.0f}kB{sizes[0] / sizes[1]:>7.2f}x{before_seconds:>13.2f}s{after_seconds:>12.2f}s")
+        if args.html:
+            slug = re.sub(r"\W+", "_", name).strip("_").lower()
+            for label, spec in (("before", before), ("after", after)):
+                with open(os.path.join(args.html, f"{slug}-{label}.html"), "w", encoding="utf-8") as fh:
+                    fh.write(RENDER_PAGE.format(name=f"{name} ({label})", spec=spec.replace("</", "<\\/")))
+    print(f"{'total':<24}{totals[0] / 1e3:>10,.0f}kB{totals[1] / 1e3:>10,.0f}kB{totals[2] / 1e3:>12,.0f}kB"
+          f"{totals[3] / 1e3:>11,.0f}kB{totals[0] / totals[1]:>7.2f}x")
+    if args.html:
+        print(f"client render time: open {args.html}/*.html in a browser; each page shows its Plotly.newPlot time")
+    else:
+        print("client render time: not measured (needs a browser); rerun with --html DIR for timing pages")
+
+
+if __name__ == "__main__":
+    main()
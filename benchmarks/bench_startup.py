@@ -0,0 +1,89 @@
+"""Per-page cold-start import report with a regression budget.
+
+For every Streamlit page the module-level imports are extracted with ``ast``
+and executed in a fresh interpreter under ``python -X importtime``. The report
+lists the slowest top-level packages per page and fails (exit code 1) when a
+page's total import time exceeds its budget in ``startup_budget.json`` or
+when a page eagerly imports one of the ``deferred_modules`` listed there.
+
+Usage: python benchmarks/bench_startup.py [--runs 3] [--top 8]
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+PAGES = ["deployment.py", "pages/1_visualization_Data.py", "pages/2_Deployment_Data.py", "pages/3_Correlation_Data.py"]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def module_level_imports(path):
+    with open(path, encoding="utf-8") as fh:
+        tree = ast.parse(fh.read(), filename=path)
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def measure(source, exclude=frozenset()):
+    """Return ``(total_us, {top_level_module: cumulative_us}, all_modules)`` for one cold run.
+
+    Modules in ``exclude`` (those loaded by a bare interpreter) are ignored.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", source],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    per_module, loaded = {}, set()
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        loaded.add(name)
+        # Only imports triggered directly by the page (no extra indentation).
+        if len(match.group(3)) == 1 and name not in exclude:
+            per_module[name] = per_module.get(name, 0) + int(match.group(2))
+    return sum(per_module.values()), per_module, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="take the fastest of N cold runs")
+    parser.add_argument("--top", type=int, default=8, help="modules to list per page")
+    args = parser.parse_args()
+
+    with open(BUDGET_FILE, encoding="utf-8") as fh:
+        config = json.load(fh)
+    budgets = config["budgets_ms"]
+    deferred = set(config.get("deferred_modules", []))
+
+    interpreter_modules = frozenset(measure("pass")[1])
+    failed = False
+    for page in PAGES:
+        source = module_level_imports(os.path.join(ROOT, page))
+        runs = [measure(source, interpreter_modules) for _ in range(args.runs)]
+        total, per_module, loaded = min(runs, key=lambda run: run[0])
+        budget_ms = budgets.get(page)
+        status = "no budget"
+        if budget_ms is not None:
+            over = total / 1000 > budget_ms
+            failed |= over
+            status = f"{'OVER' if over else 'ok'} (budget {budget_ms} ms)"
+        print(f"{page}: {total / 1000:.0f} ms  {status}")
+        eager = sorted(lazy for lazy in deferred
+                       if any(name == lazy or name.startswith(lazy + ".") for name in loaded))
+        if eager:
+            failed = True
+            print(f"    FAIL: imported at startup but should be lazy: {', '.join(eager)}")
+        for name, micros in sorted(per_module.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {micros / 1000:8.1f} ms  {name}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
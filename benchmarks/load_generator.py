@@ -0,0 +1,87 @@
+"""Drive the scoring service with concurrent single-applicant requests.
+
+Start the service first (python -m core.service), then:
+    python benchmarks/load_generator.py [--clients 32] [--requests 200]
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+
+import numpy as np
+
+
+def random_applicant(rng):
+    return {
+        "income": float(rng.integers(30000, 150001)),
+        "credit_score": float(rng.integers(300, 851)),
+        "loan_amount": float(rng.integers(1000, 50001)),
+        "years_employed": float(rng.integers(0, 41)),
+        "points": float(rng.integers(0, 101)),
+    }
+
+
+def run_client(host, port, n_requests, seed, latencies, errors):
+    rng = np.random.default_rng(seed)
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {"Content-Type": "application/json"}
+    for _ in range(n_requests):
+        body = json.dumps(random_applicant(rng))
+        start = time.perf_counter()
+        try:
+            conn.request("POST", "/score", body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as exc:
+            errors.append(repr(exc))
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def fetch_stats(host, port):
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    conn.request("GET", "/stats")
+    stats = json.loads(conn.getresponse().read())
+    conn.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    args = parser.parse_args()
+
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=run_client, args=(args.host, args.port, args.requests, seed, latencies, errors))
+        for seed in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    lat = np.array(latencies) * 1000
+    print(f"clients:      {args.clients}")
+    print(f"requests:     {len(latencies)} ok, {len(errors)} failed")
+    print(f"throughput:   {len(latencies) / elapsed:.1f} req/s")
+    if len(lat):
+        print(f"client p50:   {np.percentile(lat, 50):.2f} ms")
+        print(f"client p99:   {np.percentile(lat, 99):.2f} ms")
+    print("server stats:", json.dumps(fetch_stats(args.host, args.port), indent=2))
+
+
+if __name__ == "__main__":
+    main()
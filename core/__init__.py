@@ -0,0 +1 @@
+"""Shared, Streamlit-independent building blocks for the loan approval app."""
@@ -0,0 +1,136 @@
+"""Chunked batch scoring with memory bounded by the chunk size.
+
+The input, either an in-memory DataFrame or a CSV file, is consumed one chunk
+at a time. Every chunk is scored with ``score_frame`` and appended to an
+output CSV, so only a single chunk of rows and its engineered features are
+alive at any moment.
+"""
+import os
+import tempfile
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from core.features import INPUT_COLUMNS
+from core.scoring import DEFAULT_THRESHOLD, score_frame
+
+DEFAULT_CHUNK_SIZE = 50_000
+PREVIEW_ROWS = 1_000
+PREDICTION_COLUMNS = ["prediction", "prediction_text", "confidence"]
+
+
+@dataclass
+class BatchSummary:
+    rows: int = 0
+    approved: int = 0
+    rejected: int = 0
+    preview: pd.DataFrame = field(default_factory=pd.DataFrame)
+
+
+def _stream_size(stream):
+    position = stream.tell()
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(position)
+    return size
+
+
+def iter_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE, **read_csv_kwargs):
+    """Yield ``(chunk, fraction_done)`` pairs from a DataFrame, path or binary stream.
+
+    DataFrames are sliced without copying. CSV input is parsed lazily with
+    ``pd.read_csv(chunksize=...)`` (extra keyword arguments are passed on), and
+    progress is estimated from the byte offset of the underlying stream.
+    """
+    if isinstance(source, pd.DataFrame):
+        total = len(source)
+        for start in range(0, total, chunk_size):
+            stop = min(start + chunk_size, total)
+            yield source.iloc[start:stop], stop / total
+        return
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as stream:
+            yield from iter_chunks(stream, chunk_size, **read_csv_kwargs)
+        return
+
+    total_bytes = _stream_size(source) or 1
+    with pd.read_csv(source, chunksize=chunk_size, **read_csv_kwargs) as reader:
+        for chunk in reader:
+            yield chunk, min(source.tell() / total_bytes, 1.0)
+
+
+def score_chunk(model, chunk, threshold=DEFAULT_THRESHOLD, deduplicate=False):
+    """Return ``chunk`` with prediction columns appended."""
+    scores = score_frame(model, chunk, threshold, deduplicate=deduplicate)
+    result = chunk.copy(deep=False)
+    result["prediction"] = scores.labels
+    result["prediction_text"] = np.where(scores.labels == 1, "✅ APPROVED", "❌ REJECTED")
+    result["confidence"] = scores.confidence * 100
+    return result
+
+
+def score_batch(model, source, output, chunk_size=DEFAULT_CHUNK_SIZE, progress=None,
+                threshold=DEFAULT_THRESHOLD, deduplicate=False):
+    """Score ``source`` chunk by chunk and write the results as CSV to ``output``.
+
+    ``output`` is a path or a text stream. ``progress`` is called with the
+    fraction of input consumed after every chunk. With ``deduplicate`` each
+    chunk only sends its distinct feature rows to the model. Returns a ``BatchSummary``
+    holding the counts and the first ``PREVIEW_ROWS`` result rows.
+    """
+    if isinstance(output, (str, os.PathLike)):
+        with open(output, "w", newline="", encoding="utf-8") as stream:
+            return score_batch(model, source, stream, chunk_size, progress, threshold, deduplicate)
+
+    summary = BatchSummary()
+    preview_parts = []
+    input_columns = list(source.columns) if isinstance(source, pd.DataFrame) else None
+    for chunk, fraction in iter_chunks(source, chunk_size):
+        input_columns = list(chunk.columns)
+        if chunk.empty:
+            continue
+        result = score_chunk(model, chunk, threshold, deduplicate)
+        result.to_csv(output, index=False, header=summary.rows == 0)
+
+        approved = int((result["prediction"] == 1).sum())
+        summary.rows += len(result)
+        summary.approved += approved
+        summary.rejected += len(result) - approved
+        preview_len = sum(len(part) for part in preview_parts)
+        if preview_len < PREVIEW_ROWS:
+            preview_parts.append(result.iloc[:PREVIEW_ROWS - preview_len].copy())
+        if progress is not None:
+            progress(fraction)
+
+    if summary.rows == 0:
+        # Still write the header, so an empty input gives a readable CSV.
+        summary.preview = pd.DataFrame(columns=(input_columns or INPUT_COLUMNS) + PREDICTION_COLUMNS)
+        summary.preview.to_csv(output, index=False)
+    else:
+        summary.preview = pd.concat(preview_parts)
+    return summary
+
+
+def score_to_temp_file(progress, model, source, **kwargs):
+    """Run ``score_batch`` into a new temporary CSV; returns ``{"path", "summary"}``.
+
+    The argument order matches ``JobQueue.submit``. The file is removed again
+    if scoring fails or is cancelled.
+    """
+    with tempfile.NamedTemporaryFile(
+        "w", suffix=".csv", prefix="loan_predictions_", delete=False, newline="", encoding="utf-8"
+    ) as output:
+        try:
+            summary = score_batch(model, source, output, progress=progress, **kwargs)
+        except BaseException:
+            output.close()
+            os.remove(output.name)
+            raise
+    return {"path": output.name, "summary": summary}
+
+
+def remove_result_file(result):
+    if os.path.exists(result["path"]):
+        os.remove(result["path"])
@@ -0,0 +1,32 @@
+"""Command-line batch scoring.
+
+Usage: python -m core.cli applicants.csv -o predictions.csv [--threshold 0.5]
+"""
+import argparse
+import sys
+
+from core.batch import DEFAULT_CHUNK_SIZE, score_batch
+from core.model_registry import ModelRegistry, resolve_model_path
+from core.scoring import DEFAULT_THRESHOLD, threshold_arg
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score loan applicants from a CSV file.")
+    parser.add_argument("input", help="CSV file with income, credit_score, loan_amount, years_employed and points")
+    parser.add_argument("-o", "--output", default="-", help="output CSV path, '-' for stdout (default)")
+    parser.add_argument("--model", default=None,
+                        help="trained pipeline (.pkl) or compiled export (.npz); defaults to the newest of the two")
+    parser.add_argument("--threshold", type=threshold_arg, default=DEFAULT_THRESHOLD,
+                        help="approval probability at or above which a loan is approved")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    model = ModelRegistry(args.model or resolve_model_path()).get().model
+    output = sys.stdout if args.output == "-" else args.output
+    summary = score_batch(model, args.input, output, chunk_size=args.chunk_size, threshold=args.threshold)
+    print(f"scored {summary.rows} rows: {summary.approved} approved, {summary.rejected} rejected",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Pure-NumPy evaluator for the pickled preprocessing + XGBoost pipeline.
+
+``export_pipeline`` reads the fitted MinMaxScaler of the ColumnTransformer and
+every tree of the XGBoost booster and flattens them into a handful of arrays.
+``CompiledPipeline`` evaluates those arrays for a whole batch, walking all
+trees one level at a time, without importing xgboost or scikit-learn.
+
+The arithmetic mirrors XGBoost's CPU predictor so results are bit-for-bit
+identical: scaling in float64, features and split thresholds in float32, leaf
+values accumulated tree by tree in float32 on top of the base margin, and a
+float32 logistic transform.
+
+Usage: python -m core.compiled_model loan_approval_pipeline.pkl -o loan_approval_pipeline.npz
+"""
+import argparse
+import json
+
+import numpy as np
+
+FORMAT_VERSION = 1
+BLOCK_ROWS = 8192
+
+
+class CompiledPipeline:
+    """Flattened scaler and tree ensemble with an sklearn-style ``predict_proba``.
+
+    Nodes of all trees are stored in shared arrays with global indices. Leaves
+    point to themselves, so walking ``max_depth`` levels from every root lands
+    each row on a leaf of every tree. Positions are kept as a ``(trees, rows)``
+    array so each tree's leaves are contiguous when they are summed.
+    """
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, feature_names, scale, offset, roots, feature, threshold, left, right,
+                 default_left, leaf_value, max_depth, base_margin, source_checksum=None):
+        self.feature_names = list(feature_names)
+        # SHA-256 of the pickled pipeline this was exported from.
+        self.source_checksum = source_checksum
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.offset = np.asarray(offset, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float32)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.leaf_value = np.asarray(leaf_value, dtype=np.float32)
+        self.max_depth = int(max_depth)
+        self.base_margin = np.float32(base_margin)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def transform(self, df):
+        """Apply the MinMaxScaler step and cast to float32 like the DMatrix does."""
+        # Column-by-column stacking avoids building an intermediate DataFrame.
+        X = np.column_stack([np.asarray(df[name], dtype=np.float64) for name in self.feature_names])
+        return (X * self.scale + self.offset).astype(np.float32)
+
+    def decision_function(self, df):
+        X = self.transform(df)
+        margin = np.empty(len(X), dtype=np.float32)
+        for start in range(0, len(X), BLOCK_ROWS):
+            block = X[start:start + BLOCK_ROWS]
+            margin[start:start + len(block)] = self._margin(block)
+        return margin
+
+    def predict_proba(self, df):
+        margin = self.decision_function(df)
+        one = np.float32(1.0)
+        positive = one / (one + np.exp(-margin))
+        return np.column_stack([one - positive, positive])
+
+    def predict(self, df):
+        return (self.predict_proba(df)[:, 1] > 0.5).astype(np.int64)
+
+    def _margin(self, X):
+        n = len(X)
+        XT = np.ascontiguousarray(X.T)
+        # Every row starts at the root of every tree, so the first level only
+        # needs one feature row and one threshold per tree.
+        roots = self.roots
+        node = self._step(XT[self.feature[roots]], roots[:, None])
+        rows = np.arange(n)
+        flat = XT.ravel()
+        for _ in range(1, self.max_depth):
+            node = self._step(flat[self.feature[node] * n + rows], node)
+        leaves = self.leaf_value[node]
+        # Sequential float32 accumulation in tree order, as XGBoost does.
+        margin = np.full(n, self.base_margin, dtype=np.float32)
+        for tree_leaves in leaves:
+            margin += tree_leaves
+        return margin
+
+    def _step(self, value, node):
+        """Move every (tree, row) position in ``node`` one level down."""
+        go_left = value < self.threshold[node]
+        missing = np.isnan(value)
+        if missing.any():
+            go_left = np.where(missing, self.default_left[node], go_left)
+        return np.where(go_left, self.left[node], self.right[node])
+
+    def save(self, path):
+        meta = {"format_version": FORMAT_VERSION, "feature_names": self.feature_names,
+                "max_depth": self.max_depth, "source_sha256": self.source_checksum}
+        np.savez(
+            path,
+            meta=np.array(json.dumps(meta)),
+            scale=self.scale, offset=self.offset, roots=self.roots, feature=self.feature,
+            threshold=self.threshold, left=self.left, right=self.right,
+            default_left=self.default_left, leaf_value=self.leaf_value,
+            base_margin=np.array(self.base_margin),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as arrays:
+            meta = json.loads(str(arrays["meta"]))
+            if meta["format_version"] != FORMAT_VERSION:
+                raise ValueError(f"unsupported compiled model version {meta['format_version']}")
+            return cls(
+                meta["feature_names"], arrays["scale"], arrays["offset"], arrays["roots"],
+                arrays["feature"], arrays["threshold"], arrays["left"], arrays["right"],
+                arrays["default_left"], arrays["leaf_value"], meta["max_depth"],
+                arrays["base_margin"][()], meta.get("source_sha256"),
+            )
+
+
+def source_checksum(path):
+    """Return the SHA-256 of the pickle the export at ``path`` came from (``None`` if unrecorded)."""
+    with np.load(path, allow_pickle=False) as arrays:
+        return json.loads(str(arrays["meta"])).get("source_sha256")
+
+
+def _export_preprocessing(column_transformer):
+    from sklearn.preprocessing import MinMaxScaler
+
+    if column_transformer.remainder not in ("drop",):
+        raise ValueError("only remainder='drop' is supported")
+    names, scale, offset = [], [], []
+    for _, transformer, columns in column_transformer.transformers_:
+        if transformer == "drop" or len(columns) == 0:
+            continue
+        if not isinstance(transformer, MinMaxScaler) or transformer.clip:
+            raise ValueError(f"unsupported transformer: {transformer!r}")
+        names.extend(columns)
+        scale.extend(transformer.scale_)
+        offset.extend(transformer.min_)
+    return names, np.array(scale), np.array(offset)
+
+
+def _tree_depth(left, right):
+    depth = np.zeros(len(left), dtype=np.int64)
+    for node in range(len(left)):
+        for child in (left[node], right[node]):
+            if child != -1:
+                depth[child] = depth[node] + 1
+    return int(depth.max())
+
+
+def _export_trees(booster):
+    model = json.loads(booster.save_raw("json"))["learner"]
+    if model["objective"]["name"] != "binary:logistic":
+        raise ValueError(f"unsupported objective {model['objective']['name']!r}")
+    trees = model["gradient_booster"]["model"]["trees"]
+    base_score = np.float32(json.loads(model["learner_model_param"]["base_score"])[0]
+                            if model["learner_model_param"]["base_score"].startswith("[")
+                            else model["learner_model_param"]["base_score"])
+    # XGBoost converts the base score to a margin in double precision.
+    base_margin = np.float32(-np.log(1.0 / float(base_score) - 1.0))
+
+    roots, feature, threshold, left, right, default_left, leaf_value = [], [], [], [], [], [], []
+    max_depth, offset = 0, 0
+    for tree in trees:
+        if any(tree["split_type"]):
+            raise ValueError("categorical splits are not supported")
+        tree_left = np.array(tree["left_children"])
+        tree_right = np.array(tree["right_children"])
+        is_leaf = tree_left == -1
+        ids = np.arange(len(tree_left)) + offset
+        roots.append(offset)
+        feature.append(np.where(is_leaf, 0, tree["split_indices"]))
+        threshold.append(np.where(is_leaf, np.inf, tree["split_conditions"]))
+        left.append(np.where(is_leaf, ids, tree_left + offset))
+        right.append(np.where(is_leaf, ids, tree_right + offset))
+        default_left.append(np.array(tree["default_left"], dtype=bool))
+        leaf_value.append(np.where(is_leaf, tree["split_conditions"], 0.0))
+        max_depth = max(max_depth, _tree_depth(tree_left, tree_right))
+        offset += len(tree_left)
+
+    return (np.array(roots), np.concatenate(feature), np.concatenate(threshold).astype(np.float32),
+            np.concatenate(left), np.concatenate(right), np.concatenate(default_left),
+            np.concatenate(leaf_value).astype(np.float32), max_depth, base_margin)
+
+
+def export_pipeline(pipeline, source_checksum=None):
+    """Flatten a fitted ``Pipeline(ColumnTransformer, XGBClassifier)`` into a ``CompiledPipeline``.
+
+    ``source_checksum`` (the SHA-256 of the pickle) is stored with the export
+    so a stale export can be told apart from a current one.
+    """
+    preprocessing, classifier = pipeline.steps[0][1], pipeline.steps[-1][1]
+    names, scale, offset = _export_preprocessing(preprocessing)
+    trees = _export_trees(classifier.get_booster())
+    return CompiledPipeline(names, scale, offset, *trees, source_checksum=source_checksum)
+
+
+def main(argv=None):
+    import joblib
+
+    from core.model_registry import file_checksum
+
+    parser = argparse.ArgumentParser(description="Export the trained pipeline to NumPy arrays.")
+    parser.add_argument("pipeline", help="path to the joblib-pickled pipeline")
+    parser.add_argument("-o", "--output", required=True, help="destination .npz file")
+    args = parser.parse_args(argv)
+
+    # Hash before loading, so the recorded checksum never describes newer bytes.
+    checksum = file_checksum(args.pipeline)
+    compiled = export_pipeline(joblib.load(args.pipeline), checksum)
+    compiled.save(args.output)
+    print(f"exported {compiled.n_trees} trees (max depth {compiled.max_depth}) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
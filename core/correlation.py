@@ -0,0 +1,139 @@
+"""Correlation matrices from streaming sufficient statistics.
+
+Each chunk of rows adds its pairwise counts, sums, sums of squares and
+cross-products to a ``CorrelationStats`` accumulator; the Pearson matrix
+follows from those totals, so one pass over the data suffices and only one
+chunk is in memory at a time. Missing values are handled pairwise, as in
+``DataFrame.corr``. Values are shifted by the first chunk's means before
+accumulating, which avoids catastrophic cancellation on large magnitudes.
+
+Spearman correlation is the Pearson correlation of the columns' ranks. Ranks
+need every value of a column, so the correlation columns are loaded whole
+(the Spearman path is bounded by their size, not by the chunk size), ranked
+one column at a time, and the rank-transformed chunks then go through the
+same accumulator. Like ``DataFrame.corr``, a pair involving a column with
+missing values is re-ranked over only the rows where both are present.
+"""
+import numpy as np
+import pandas as pd
+
+from core.batch import DEFAULT_CHUNK_SIZE, iter_chunks
+
+PEARSON = "pearson"
+SPEARMAN = "spearman"
+
+
+def correlation_columns(df):
+    """Numeric and boolean columns, as selected by ``DataFrame.corr(numeric_only=True)``."""
+    return [
+        column for column in df.columns
+        if pd.api.types.is_numeric_dtype(df[column]) or pd.api.types.is_bool_dtype(df[column])
+    ]
+
+
+class CorrelationStats:
+    """Pairwise sufficient statistics of a fixed set of columns."""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.shift = None
+        self.rows = 0
+        self.counts = np.zeros((k, k))
+        self.sums = np.zeros((k, k))
+        self.squares = np.zeros((k, k))
+        self.products = np.zeros((k, k))
+
+    def update(self, chunk):
+        """Add the rows of ``chunk`` (a DataFrame holding ``columns``)."""
+        values = np.column_stack([
+            chunk[column].to_numpy(dtype=np.float64, na_value=np.nan) for column in self.columns
+        ]) if len(chunk) else np.empty((0, len(self.columns)))
+        if self.shift is None and len(values):
+            with np.errstate(invalid="ignore"):
+                shift = np.nanmean(values, axis=0)
+            self.shift = np.nan_to_num(shift)
+        if not len(values):
+            return self
+        present = ~np.isnan(values)
+        centered = np.where(present, values - self.shift, 0.0)
+        weights = present.astype(np.float64)
+        # Entry (i, j) only counts rows where both column i and column j are present.
+        self.counts += weights.T @ weights
+        self.sums += centered.T @ weights
+        self.squares += (centered * centered).T @ weights
+        self.products += centered.T @ centered
+        self.rows += len(values)
+        return self
+
+    def matrix(self):
+        """Return the correlation matrix as a DataFrame (NaN where undefined)."""
+        n = self.counts
+        covariance = n * self.products - self.sums * self.sums.T
+        variance_i = n * self.squares - self.sums ** 2
+        variance_j = variance_i.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = covariance / np.sqrt(variance_i * variance_j)
+        corr = np.clip(corr, -1.0, 1.0)
+        corr[n < 2] = np.nan
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def _rank_columns(source, columns):
+    """Average ranks of every column of an in-memory frame, one column at a time."""
+    return pd.DataFrame(
+        {column: source[column].rank(method="average").to_numpy(dtype=np.float64, na_value=np.nan) for column in columns},
+        index=source.index,
+    )
+
+
+def _rerank_incomplete_pairs(source, columns, matrix):
+    """Recompute Spearman entries of pairs with missing values over their complete rows.
+
+    Ranking a column over all its rows gives different ranks than ranking it
+    over the rows a pair shares, so such pairs are ranked again per pair.
+    """
+    values = {column: source[column].to_numpy(dtype=np.float64, na_value=np.nan) for column in columns}
+    incomplete = {column for column in columns if np.isnan(values[column]).any()}
+    if not incomplete:
+        return matrix
+    for i, first in enumerate(columns):
+        for second in columns[i + 1:]:
+            if first not in incomplete and second not in incomplete:
+                continue
+            both = ~np.isnan(values[first]) & ~np.isnan(values[second])
+            pair = pd.DataFrame({0: values[first][both], 1: values[second][both]}).rank(method="average")
+            stats = CorrelationStats([0, 1]).update(pair)
+            matrix.loc[first, second] = matrix.loc[second, first] = stats.matrix().iloc[0, 1]
+    return matrix
+
+
+def correlation_matrix(source, method=PEARSON, columns=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Return ``(matrix, rows)`` for a DataFrame, CSV path or binary stream.
+
+    ``progress`` is called with the fraction processed after every chunk.
+    For Spearman, the correlation columns are read into memory as a whole,
+    since ranking needs each complete column.
+    """
+    if not isinstance(source, pd.DataFrame):
+        if columns is None:
+            columns = correlation_columns(pd.read_csv(source, nrows=1_000))
+            if hasattr(source, "seek"):
+                source.seek(0)
+        if method == SPEARMAN:
+            source = pd.read_csv(source, usecols=columns)
+    columns = columns or correlation_columns(source)
+    if method == SPEARMAN:
+        values, source = source, _rank_columns(source, columns)
+    elif method != PEARSON:
+        raise ValueError(f"Unknown correlation method {method!r}")
+
+    stats = CorrelationStats(columns)
+    for chunk, fraction in iter_chunks(source, chunk_size):
+        stats.update(chunk)
+        if progress is not None:
+            progress(fraction)
+    matrix = stats.matrix()
+    if method == SPEARMAN:
+        matrix = _rerank_incomplete_pairs(values, columns, matrix)
+    return matrix, stats.rows
@@ -0,0 +1,202 @@
+"""Precomputed counts and loan totals over the display score groups.
+
+Every row is reduced to one flat cell number combining its credit, points
+and income band and its approval status; ``np.bincount`` over those numbers
+then yields the row count and the loan-amount total of every combination in
+a single pass. Donuts, countplots, crosstabs and drill-downs are answered by
+slicing and summing this small array instead of scanning the rows again.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from core.derived import DISPLAY_GROUPS, get_groups
+
+TARGET_COLUMN = "loan_approved"
+AMOUNT_COLUMN = "loan_amount"
+MISSING_LABEL = "(missing)"
+# Positions on the approval axis.
+REJECTED, APPROVED, UNKNOWN = 0, 1, 2
+MAX_CUBES = 4
+# seaborn's two-colour "husl" palette, without importing seaborn.
+COUNTPLOT_COLORS = ["#f77189", "#36ada4"]
+
+
+class GroupCube:
+    """Counts and loan-amount totals by score groups x approval status.
+
+    Each group axis has one slot per band plus a last slot for rows outside
+    every band; the approval axis is (rejected, approved, unknown).
+    """
+
+    def __init__(self, dimensions, labels, counts, amounts):
+        self.dimensions = list(dimensions)
+        self.labels = {dimension: list(labels[dimension]) for dimension in self.dimensions}
+        self.counts = counts
+        self.amounts = amounts
+
+    @property
+    def rows(self):
+        return int(self.counts.sum())
+
+    def _select(self, filters):
+        counts, amounts = self.counts, self.amounts
+        for axis, dimension in enumerate(self.dimensions):
+            selected = (filters or {}).get(dimension)
+            if selected:
+                index = [self.labels[dimension].index(label) for label in selected]
+                counts = np.take(counts, index, axis=axis)
+                amounts = np.take(amounts, index, axis=axis)
+        return counts, amounts
+
+    def _labels_of(self, dimension, filters):
+        selected = (filters or {}).get(dimension)
+        return list(selected) if selected else self.labels[dimension]
+
+    def summary(self, by=(), filters=None, drop_empty=True):
+        """Return count, approvals, approval rate and loan totals grouped by the ``by`` dimensions.
+
+        ``filters`` maps a dimension to the labels to keep. With no ``by``
+        dimensions a single overall row is returned.
+        """
+        by = list(by)
+        counts, amounts = self._select(filters)
+        summed = tuple(axis for axis, dimension in enumerate(self.dimensions) if dimension not in by)
+        counts, amounts = counts.sum(axis=summed), amounts.sum(axis=summed)
+        # The remaining axes are the ``by`` dimensions in cube order, then approval.
+        in_cube_order = [dimension for dimension in self.dimensions if dimension in by]
+        permutation = [in_cube_order.index(dimension) for dimension in by] + [len(by)]
+        counts = counts.transpose(permutation).reshape(-1, counts.shape[-1])
+        amounts = amounts.transpose(permutation).reshape(-1, amounts.shape[-1])
+        if len(by) > 1:
+            index = pd.MultiIndex.from_product([self._labels_of(dimension, filters) for dimension in by], names=by)
+        elif by:
+            index = pd.Index(self._labels_of(by[0], filters), name=by[0])
+        else:
+            index = pd.Index(["All"], name="group")
+
+        decided = counts[:, REJECTED] + counts[:, APPROVED]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rate = counts[:, APPROVED] / decided
+            mean_amount = amounts.sum(axis=1) / counts.sum(axis=1)
+        table = pd.DataFrame({
+            "count": counts.sum(axis=1),
+            "approved": counts[:, APPROVED],
+            "rejected": counts[:, REJECTED],
+            "approval_rate": rate,
+            "loan_amount_total": amounts.sum(axis=1),
+            "loan_amount_approved": amounts[:, APPROVED],
+            "loan_amount_mean": mean_amount,
+        }, index=index)
+        if drop_empty:
+            table = table[table["count"] > 0]
+        return table
+
+    def counts_by(self, dimension, filters=None):
+        """Row count per label of ``dimension`` (a donut or bar chart)."""
+        return self.summary([dimension], filters)["count"]
+
+    def crosstab(self, dimension, filters=None):
+        """Rows per label of ``dimension`` and approval status, like ``value_counts().unstack()``."""
+        table = self.summary([dimension], filters)
+        return table[["rejected", "approved"]].rename(columns={"rejected": False, "approved": True})
+
+
+def donut_figure(counts, dimension, template="plotly_dark"):
+    """Plotly donut of a ``GroupCube.counts_by`` series."""
+    import plotly.express as px
+
+    donut_data = pd.DataFrame({dimension: [str(label) for label in counts.index], "count": counts.to_numpy()})
+    return px.pie(
+        donut_data,
+        names=dimension,
+        values="count",
+        title=f"Distribution of {dimension}",
+        hole=0.6,
+        color_discrete_sequence=px.colors.qualitative.Set3,
+        template=template
+    )
+
+
+def countplot_figure(crosstab, dimension, figsize=(10, 6)):
+    """Grouped bars of a ``GroupCube.crosstab`` in the style of ``sns.countplot(hue=...)``."""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    fig.patch.set_facecolor('#0D1117')
+    ax = fig.subplots()
+    ax.set_facecolor('#161B22')
+    positions = np.arange(len(crosstab))
+    width = 0.8 / len(crosstab.columns)
+    for k, status in enumerate(crosstab.columns):
+        offset = (k - (len(crosstab.columns) - 1) / 2) * width
+        ax.bar(positions + offset, crosstab[status], width, color=COUNTPLOT_COLORS[k % 2], label=str(status))
+    ax.set_xticks(positions, [str(label) for label in crosstab.index])
+    legend = ax.legend(title=TARGET_COLUMN, facecolor='#161B22', edgecolor='#30363D')
+    for text in legend.get_texts() + [legend.get_title()]:
+        text.set_color('white')
+    ax.set_title(f"Count Distribution: {dimension}", fontsize=14, color='white', fontweight='bold')
+    ax.set_xlabel(dimension, color='white')
+    ax.set_ylabel("Count", color='white')
+    ax.tick_params(colors='white')
+    return fig
+
+
+def _axis_codes(series, size):
+    codes = np.asarray(series.cat.codes, dtype=np.int64).copy()
+    codes[codes < 0] = size
+    return codes
+
+
+def build_cube(df, groups):
+    """Build the cube of ``df`` from its display ``groups`` (see ``core.derived``)."""
+    dimensions = [dimension for dimension in DISPLAY_GROUPS if dimension in groups.columns]
+    labels, sizes = {}, []
+    flat = np.zeros(len(df), dtype=np.int64)
+    for dimension in dimensions:
+        categories = list(groups[dimension].cat.categories)
+        labels[dimension] = categories + [MISSING_LABEL]
+        sizes.append(len(categories) + 1)
+        flat = flat * sizes[-1] + _axis_codes(groups[dimension], len(categories))
+
+    if TARGET_COLUMN in df.columns:
+        target = df[TARGET_COLUMN].to_numpy(dtype=np.float64, na_value=np.nan)
+        approval = np.where(np.isnan(target), UNKNOWN, np.where(target == 1, APPROVED, REJECTED))
+    else:
+        approval = np.full(len(df), UNKNOWN)
+    flat = flat * 3 + approval
+
+    shape = tuple(sizes) + (3,)
+    cells = int(np.prod(shape))
+    counts = np.bincount(flat, minlength=cells)
+    if AMOUNT_COLUMN in df.columns:
+        amount = df[AMOUNT_COLUMN].to_numpy(dtype=np.float64, na_value=np.nan)
+        present = ~np.isnan(amount)
+        amounts = np.bincount(flat[present], weights=amount[present], minlength=cells)
+    else:
+        amounts = np.zeros(cells)
+    return GroupCube(dimensions, labels, counts.reshape(shape), amounts.reshape(shape))
+
+
+_cubes = OrderedDict()
+_cubes_lock = threading.Lock()
+
+
+def get_cube(key, df):
+    """Return the shared cube of the dataset with fingerprint ``key`` (not shared without one)."""
+    if key is None:
+        return build_cube(df, get_groups(key, df))
+    with _cubes_lock:
+        cube = _cubes.get(key)
+        if cube is not None:
+            _cubes.move_to_end(key)
+            return cube
+    cube = build_cube(df, get_groups(key, df))
+    with _cubes_lock:
+        cube = _cubes.setdefault(key, cube)
+        _cubes.move_to_end(key)
+        while len(_cubes) > MAX_CUBES:
+            _cubes.popitem(last=False)
+        return cube
@@ -0,0 +1,152 @@
+"""Content-addressed cache of parsed datasets with an on-disk columnar spill.
+
+Uploads are identified by the SHA-256 of their bytes. The first time a file
+is seen it is parsed and written to ``<cache dir>/<sha256>.arrow`` (Arrow IPC,
+uncompressed); any later upload of the same content, from any page or session
+and across server restarts, memory-maps the columnar file instead of parsing
+CSV again. The directory is kept under a byte budget by evicting the least
+recently used files.
+"""
+import hashlib
+import os
+import threading
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "datasets")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+def fingerprint(source, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a path or binary stream (rewound afterwards)."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as stream:
+            return fingerprint(stream, chunk_size)
+    digest = hashlib.sha256()
+    source.seek(0)
+    for chunk in iter(lambda: source.read(chunk_size), b""):
+        digest.update(chunk)
+    source.seek(0)
+    return digest.hexdigest()
+
+
+def _arrow_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def read_mapped(path):
+    """Memory-map an Arrow IPC file and expose it as a read-only DataFrame.
+
+    Fixed-width columns without nulls stay backed by the mapped file, so the
+    operating system shares their pages between everything that maps it.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def write_arrow(df, path):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+class DatasetCache:
+    """Parsed DataFrames keyed by content hash, spilled to Arrow IPC files on disk.
+
+    Without pyarrow nothing is written and every lookup is a miss.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.on_disk = _arrow_available()
+        if self.on_disk:
+            os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{key}.arrow")
+
+    def get(self, key):
+        if not self.on_disk:
+            return None
+        path = self.path_for(key)
+        try:
+            df = read_mapped(path)
+            # The modification time doubles as the LRU timestamp.
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return df
+
+    def put(self, key, df):
+        """Spill ``df`` to disk and return the memory-mapped copy (or ``df`` itself)."""
+        if not self.on_disk:
+            return df
+        path = self.path_for(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        write_arrow(df, tmp_path)
+        os.replace(tmp_path, path)
+        self.evict(keep=key)
+        return read_mapped(path)
+
+    def load(self, source, parse, key=None):
+        """Return ``(key, df)`` for ``source``, calling ``parse(source)`` only on a miss.
+
+        ``key`` is the fingerprint of ``source`` if the caller already has it.
+        """
+        key = key or fingerprint(source)
+        df = self.get(key)
+        if df is None:
+            df = self.put(key, parse(source))
+        return key, df
+
+    def evict(self, keep=None):
+        """Delete least recently used files until the directory fits ``max_bytes``.
+
+        The file for ``keep`` is never removed. Files that are still mapped by
+        a reader stay valid until unmapped.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".arrow") or name == f"{keep}.arrow":
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        if keep is not None and os.path.exists(self.path_for(keep)):
+            total += os.path.getsize(self.path_for(keep))
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            total -= size
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_dataset_cache():
+    """Return the process-wide dataset cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = DatasetCache(
+                os.environ.get("LOAN_APP_CACHE_DIR", DEFAULT_CACHE_DIR),
+                int(os.environ.get("LOAN_APP_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+            )
+        return _cache
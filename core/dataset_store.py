@@ -0,0 +1,86 @@
+"""Process-wide store of uploaded datasets shared by every Streamlit session.
+
+Each distinct upload is materialised once, memory-mapped from the dataset
+cache, and handed out as the same read-only DataFrame to every session that
+uploads the same bytes. Sessions hold a ``DatasetHandle``; the store counts
+handles per dataset and drops its reference to a frame as soon as no session
+uses it any more (explicitly via ``release`` or when the session state holding
+the handle is garbage collected).
+"""
+import threading
+import weakref
+
+from core.dataset_cache import fingerprint, get_dataset_cache
+
+
+class DatasetHandle:
+    """A session's reference to a shared dataset."""
+
+    def __init__(self, store, key, name):
+        self.key = key
+        self.name = name
+        self._store = store
+        self._finalizer = weakref.finalize(self, store._release, key)
+
+    @property
+    def data(self):
+        return self._store.frame(self.key)
+
+    @property
+    def released(self):
+        return not self._finalizer.alive
+
+    def release(self):
+        self._finalizer()
+
+
+class DatasetStore:
+    def __init__(self, cache=None):
+        self.cache = cache or get_dataset_cache()
+        self._frames = {}
+        self._refs = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, source, parse, name=None):
+        """Return a handle to the dataset in ``source``, parsing it at most once."""
+        key = fingerprint(source)
+        with self._lock:
+            if key in self._frames:
+                self._refs[key] += 1
+                return DatasetHandle(self, key, name)
+
+        # Parse outside the lock; the cache writes atomically, so a race only
+        # costs a duplicate parse, never a torn file.
+        _, df = self.cache.load(source, parse, key)
+        with self._lock:
+            df = self._frames.setdefault(key, df)
+            self._refs[key] = self._refs.get(key, 0) + 1
+        return DatasetHandle(self, key, name)
+
+    def frame(self, key):
+        with self._lock:
+            return self._frames[key]
+
+    def stats(self):
+        with self._lock:
+            return {key: refs for key, refs in self._refs.items()}
+
+    def _release(self, key):
+        with self._lock:
+            self._refs[key] -= 1
+            if self._refs[key] <= 0:
+                del self._refs[key]
+                del self._frames[key]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_dataset_store():
+    """Return the process-wide dataset store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DatasetStore()
+        return _store
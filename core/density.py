@@ -0,0 +1,184 @@
+"""Scatter plots that stay responsive on large uploads.
+
+Below ``WEBGL_THRESHOLD`` rows points are drawn as SVG, up to
+``DENSITY_THRESHOLD`` rows through WebGL, and above that the points are
+aggregated on the server into a 2D grid: one count and one approval rate per
+cell, computed with a single ``np.bincount`` pass. A sample drawn evenly
+across occupied cells is overlaid so hover details remain available, sparse
+regions and outliers included.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+WEBGL_THRESHOLD = 5_000
+DENSITY_THRESHOLD = 100_000
+DEFAULT_GRID_BINS = 120
+DEFAULT_SAMPLE_SIZE = 5_000
+
+SVG = "svg"
+WEBGL = "webgl"
+DENSITY = "density"
+
+
+def render_mode(n_rows):
+    """Return how a scatter of ``n_rows`` points should be drawn."""
+    if n_rows > DENSITY_THRESHOLD:
+        return DENSITY
+    if n_rows > WEBGL_THRESHOLD:
+        return WEBGL
+    return SVG
+
+
+@dataclass(frozen=True)
+class DensityGrid:
+    x_edges: np.ndarray
+    y_edges: np.ndarray
+    counts: np.ndarray
+    rate: np.ndarray
+
+    @property
+    def x_centers(self):
+        return (self.x_edges[:-1] + self.x_edges[1:]) / 2
+
+    @property
+    def y_centers(self):
+        return (self.y_edges[:-1] + self.y_edges[1:]) / 2
+
+
+def _edges(values, bins):
+    low, high = float(values.min()), float(values.max())
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return np.linspace(low, high, bins + 1)
+
+
+def _bin_index(values, edges):
+    bins = len(edges) - 1
+    index = ((values - edges[0]) * (bins / (edges[-1] - edges[0]))).astype(np.int64)
+    # The maximum lands exactly on the last edge; keep it in the last bin.
+    return np.minimum(index, bins - 1)
+
+
+def density_grid(x, y, weights=None, bins=DEFAULT_GRID_BINS):
+    """Aggregate points into a ``bins`` x ``bins`` grid.
+
+    Returns ``(grid, cells)``. ``grid.counts[i, j]`` is the number of points in
+    y-bin ``i`` and x-bin ``j``; ``grid.rate`` is the mean of ``weights`` (e.g.
+    ``loan_approved``) per cell, NaN where a cell has no weighted rows.
+    ``cells`` holds the flat cell number of every input row (-1 where x or y
+    is missing) for stratified sampling.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    if not valid.any():
+        raise ValueError("No rows with both coordinates present")
+    x_edges, y_edges = _edges(x[valid], bins), _edges(y[valid], bins)
+
+    cells = np.full(len(x), -1, dtype=np.int64)
+    cells[valid] = _bin_index(y[valid], y_edges) * bins + _bin_index(x[valid], x_edges)
+    flat = cells[valid]
+    counts = np.bincount(flat, minlength=bins * bins).astype(np.float64)
+    if weights is None:
+        rate = np.full(bins * bins, np.nan)
+    else:
+        weights = np.asarray(weights, dtype=np.float64)[valid]
+        weighted = ~np.isnan(weights)
+        totals = np.bincount(flat[weighted], weights=weights[weighted], minlength=bins * bins)
+        weighted_counts = np.bincount(flat[weighted], minlength=bins * bins)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rate = totals / weighted_counts
+    grid = DensityGrid(
+        x_edges=x_edges,
+        y_edges=y_edges,
+        counts=counts.reshape(bins, bins),
+        rate=rate.reshape(bins, bins),
+    )
+    return grid, cells
+
+
+def stratified_sample(cells, size=DEFAULT_SAMPLE_SIZE, seed=0):
+    """Return up to ``size`` row positions spread evenly over the occupied cells.
+
+    Every occupied cell contributes up to the same number of randomly chosen
+    rows, so sparse cells are represented as well as dense ones.
+    """
+    rng = np.random.default_rng(seed)
+    positions = np.flatnonzero(cells >= 0)
+    if len(positions) <= size:
+        return positions
+    positions = positions[rng.permutation(len(positions))]
+    occupied = np.unique(cells[positions])
+    per_cell = max(1, size // len(occupied))
+    # Rank of each row within its cell, in the shuffled order.
+    order = np.argsort(cells[positions], kind="stable")
+    sorted_cells = cells[positions][order]
+    starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+    run_lengths = np.diff(np.r_[starts, len(sorted_cells)])
+    ranks = np.arange(len(sorted_cells)) - np.repeat(starts, run_lengths)
+    chosen = positions[order[ranks < per_cell]]
+    if len(chosen) > size:
+        chosen = rng.choice(chosen, size, replace=False)
+    return np.sort(chosen)
+
+
+def density_figure(grid, sample, x, y, hover_columns, rate_label="Approval rate",
+                   title=None, template="plotly_dark"):
+    """Plotly figure of ``grid`` as a heatmap with ``sample`` overlaid as WebGL points."""
+    import plotly.graph_objects as go
+
+    has_rate = not np.isnan(grid.rate).all()
+    z = grid.rate if has_rate else np.where(grid.counts > 0, np.log10(grid.counts), np.nan)
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        x=grid.x_centers,
+        y=grid.y_centers,
+        z=z,
+        customdata=grid.counts,
+        colorscale="RdYlGn" if has_rate else "Viridis",
+        zmin=0 if has_rate else None,
+        zmax=1 if has_rate else None,
+        colorbar=dict(title=rate_label if has_rate else "log10(count)"),
+        hovertemplate=(
+            f"{x}: %{{x:.4g}}<br>{y}: %{{y:.4g}}<br>Rows: %{{customdata:,.0f}}"
+            + (f"<br>{rate_label}: %{{z:.1%}}" if has_rate else "")
+            + "<extra></extra>"
+        ),
+    ))
+    hover_columns = [column for column in hover_columns if column not in (x, y)]
+    fig.add_trace(go.Scattergl(
+        x=sample[x],
+        y=sample[y],
+        mode="markers",
+        marker=dict(size=3, color="rgba(255, 255, 255, 0.35)"),
+        customdata=sample[hover_columns].astype(str).to_numpy() if hover_columns else None,
+        hovertemplate=(
+            f"{x}: %{{x}}<br>{y}: %{{y}}<br>"
+            + "<br>".join(f"{column}: %{{customdata[{i}]}}" for i, column in enumerate(hover_columns))
+            + "<extra>sample</extra>"
+        ),
+        name="Sampled rows",
+        showlegend=False,
+    ))
+    fig.update_layout(
+        title=title,
+        template=template,
+        xaxis_title=x,
+        yaxis_title=y,
+    )
+    return fig
+
+
+def scatter_density(df, x, y, weight_column=None, bins=DEFAULT_GRID_BINS, sample_size=DEFAULT_SAMPLE_SIZE):
+    """Return the density grid of ``df[x]`` vs ``df[y]`` and its stratified row sample."""
+    weights = None
+    if weight_column is not None and weight_column in df.columns:
+        weights = df[weight_column].to_numpy(dtype=np.float64, na_value=np.nan)
+    grid, cells = density_grid(
+        df[x].to_numpy(dtype=np.float64, na_value=np.nan),
+        df[y].to_numpy(dtype=np.float64, na_value=np.nan),
+        weights,
+        bins,
+    )
+    return grid, df.iloc[stratified_sample(cells, sample_size)]
@@ -0,0 +1,82 @@
+"""Derived display columns computed once per uploaded dataset.
+
+The visualization page groups credit score, points and income into labelled
+bands. The bands are computed here with one ``np.searchsorted`` per column
+and stored as ordered categoricals over int8 codes, instead of one Python
+string per row. Results are shared by every consumer of the same dataset
+fingerprint; their code arrays are read-only, and pandas copy-on-write keeps
+any frame built from them from writing back.
+
+These are the display bands of the dashboard. The model's own group features
+use different edges and live in ``core.features``.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MAX_DATASETS = 4
+
+# group column -> (source column, bin edges, labels). Bins are closed on the
+# right and the first one also includes its lower edge, like
+# ``pd.cut(..., include_lowest=True)``; values outside the edges have no group.
+DISPLAY_GROUPS = {
+    "credit_score_group": ("credit_score", np.array([300.0, 579.0, 669.0, 740.0, 850.0]),
+                           ["Poor", "Fair", "Good", "Excellent"]),
+    "points_score_group": ("points", np.array([0.0, 35.0, 60.0, 100.0]),
+                           ["Poor", "Fair", "Excellent"]),
+    "income_score_group": ("income", np.array([30053.0, 61000.0, 91000.0, 120000.0, 150000.0]),
+                           ["Limited", "Moderate", "Solid", "High"]),
+}
+
+
+def band_codes(values, edges):
+    """Return the int8 band of every value (-1 outside ``edges`` or missing)."""
+    values = np.asarray(values, dtype=np.float64)
+    codes = np.searchsorted(edges, values, side="left") - 1
+    codes[values == edges[0]] = 0
+    codes[(values < edges[0]) | (values > edges[-1]) | np.isnan(values)] = -1
+    return codes.astype(np.int8)
+
+
+def compute_groups(df):
+    """Return a frame with one ordered categorical per display group ``df`` can provide."""
+    columns = {}
+    for group, (source, edges, labels) in DISPLAY_GROUPS.items():
+        if source not in df.columns:
+            continue
+        codes = band_codes(df[source].to_numpy(dtype=np.float64, na_value=np.nan), edges)
+        codes.flags.writeable = False
+        columns[group] = pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+    return pd.DataFrame(columns, index=df.index)
+
+
+_groups = OrderedDict()
+_groups_lock = threading.Lock()
+
+
+def get_groups(key, df):
+    """Return the shared display groups of the dataset with fingerprint ``key``.
+
+    Without a fingerprint the groups are computed but not shared.
+    """
+    if key is None:
+        return compute_groups(df)
+    with _groups_lock:
+        groups = _groups.get(key)
+        if groups is not None:
+            _groups.move_to_end(key)
+            return groups
+    groups = compute_groups(df)
+    with _groups_lock:
+        groups = _groups.setdefault(key, groups)
+        _groups.move_to_end(key)
+        while len(_groups) > MAX_DATASETS:
+            _groups.popitem(last=False)
+        return groups
+
+
+def with_groups(key, df):
+    """Return ``df`` with its display groups appended as extra columns, without copying either."""
+    return pd.concat([df, get_groups(key, df)], axis=1)
@@ -0,0 +1,266 @@
+"""On-demand, chunked dataset exports cached on disk.
+
+Exports are only produced when a download is actually requested. Rows are
+written one chunk at a time, so memory stays bounded by the chunk size: CSV
+and gzip-compressed CSV through ``DataFrame.to_csv`` on an open stream, Excel
+through an openpyxl write-only workbook, and Parquet through one row group per
+chunk after a first pass has fixed a dtype per column that fits every chunk. Finished files are stored under ``<cache dir>/<fingerprint>.<extension>``
+and reused by every later download of the same dataset in that format.
+"""
+import gzip
+import os
+import threading
+from dataclasses import dataclass
+
+import pandas as pd
+
+from core.batch import DEFAULT_CHUNK_SIZE, iter_chunks
+
+DEFAULT_EXPORT_DIR = os.path.join(".cache", "exports")
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+# Excel caps a worksheet at 1,048,576 rows including the header row.
+EXCEL_MAX_ROWS = 1_048_575
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    label: str
+    extension: str
+    mime: str
+
+
+FORMATS = {
+    "csv": ExportFormat("CSV", "csv", "text/csv"),
+    "csv.gz": ExportFormat("CSV (gzip)", "csv.gz", "application/gzip"),
+    "xlsx": ExportFormat(
+        "Excel", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    ),
+    "parquet": ExportFormat("Parquet", "parquet", "application/vnd.apache.parquet"),
+}
+
+
+def _write_csv(chunks, path, compress=False):
+    opener = gzip.open if compress else open
+    with opener(path, "wt", newline="", encoding="utf-8") as sink:
+        header = True
+        for chunk in chunks:
+            chunk.to_csv(sink, index=False, header=header)
+            header = False
+
+
+def _excel_rows(chunk):
+    # openpyxl rejects NumPy scalars and pandas NA; object arrays hold plain Python values.
+    columns = [
+        chunk[name].astype(object).where(chunk[name].notna(), None).to_numpy()
+        for name in chunk.columns
+    ]
+    return zip(*columns)
+
+
+def _write_excel(chunks, path):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet, rows_in_sheet, header = None, 0, None
+    try:
+        for chunk in chunks:
+            header = list(chunk.columns)
+            for row in _excel_rows(chunk):
+                if sheet is None or rows_in_sheet == EXCEL_MAX_ROWS:
+                    sheet = workbook.create_sheet(f"Sheet{len(workbook.worksheets) + 1}")
+                    sheet.append(header)
+                    rows_in_sheet = 0
+                sheet.append(row)
+                rows_in_sheet += 1
+    except BaseException:
+        # Finish the sheets' temporary files so they are not flushed after deletion.
+        for worksheet in workbook.worksheets:
+            worksheet.close()
+        raise
+    if sheet is None:
+        sheet = workbook.create_sheet("Sheet1")
+        if header:
+            sheet.append(header)
+    workbook.save(path)
+
+
+# Column kinds from narrowest to widest; a column takes the widest kind seen in any chunk.
+_PARQUET_KINDS = ["boolean", "Int64", "float64", "string"]
+
+
+def _kind(series):
+    if pd.api.types.is_bool_dtype(series):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(series):
+        return "Int64"
+    if pd.api.types.is_numeric_dtype(series):
+        return "float64"
+    return "string"
+
+
+def parquet_dtypes(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return one dtype per column that holds the values of every chunk of CSV ``source``.
+
+    A Parquet file has a single schema, fixed by its first row group, while
+    CSV chunks are typed independently: an integer-looking first chunk may be
+    followed by decimals, or an all-empty column by text. All-missing chunks
+    do not constrain a column.
+    """
+    kinds = {}
+    for chunk, _ in iter_chunks(source, chunk_size):
+        for column in chunk.columns:
+            current = kinds.setdefault(column, None)
+            if chunk[column].isna().all():
+                continue
+            kind = _kind(chunk[column])
+            if current is None or _PARQUET_KINDS.index(kind) > _PARQUET_KINDS.index(current):
+                kinds[column] = kind
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return {column: kind or "string" for column, kind in kinds.items()}
+
+
+def _write_parquet(chunks, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression="snappy")
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        raise ValueError("Cannot export an empty input to Parquet")
+
+
+_WRITERS = {
+    "csv": _write_csv,
+    "csv.gz": lambda chunks, path: _write_csv(chunks, path, compress=True),
+    "xlsx": _write_excel,
+    "parquet": _write_parquet,
+}
+
+
+def _chunks(source, chunk_size, progress, dtype=None):
+    read_csv_kwargs = {} if dtype is None else {"dtype": dtype}
+    for chunk, fraction in iter_chunks(source, chunk_size, **read_csv_kwargs):
+        yield chunk
+        if progress is not None:
+            progress(fraction)
+
+
+def write_export(source, fmt, path, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Write ``source`` (DataFrame, CSV path or stream) to ``path`` in ``fmt``, chunk by chunk.
+
+    ``progress`` is called with the fraction of input written after every chunk.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {sorted(_WRITERS)}")
+    # A DataFrame already has one dtype per column; CSV chunks are typed one by one.
+    csv_source = not isinstance(source, pd.DataFrame)
+    dtype = parquet_dtypes(source, chunk_size) if fmt == "parquet" and csv_source else None
+    _WRITERS[fmt](_chunks(source, chunk_size, progress, dtype), path)
+
+
+class ExportCache:
+    """Finished export files keyed by dataset fingerprint and format.
+
+    The directory is kept under ``max_bytes`` by deleting the least recently
+    downloaded files.
+    """
+
+    def __init__(self, directory=DEFAULT_EXPORT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._locks = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key, fmt):
+        return os.path.join(self.directory, f"{key}.{FORMATS[fmt].extension}")
+
+    def _key_lock(self, path):
+        with self._lock:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def cached(self, key, fmt):
+        return os.path.exists(self.path_for(key, fmt))
+
+    def export(self, key, fmt, source, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+        """Return the path of the ``fmt`` export of ``key``, writing it from ``source`` on a miss.
+
+        ``source`` may be a callable returning the data, so nothing is loaded
+        when the file is already cached. Concurrent requests for the same file
+        wait for a single writer.
+        """
+        path = self.path_for(key, fmt)
+        with self._key_lock(path):
+            if os.path.exists(path):
+                os.utime(path)
+                return path
+            if callable(source):
+                source = source()
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                write_export(source, fmt, tmp_path, chunk_size, progress)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        self.evict(keep=path)
+        return path
+
+    def read(self, key, fmt, source, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Like ``export`` but return the file's bytes, e.g. for a download button."""
+        with open(self.export(key, fmt, source, chunk_size), "rb") as stream:
+            return stream.read()
+
+    def evict(self, keep=None):
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".tmp") or path == keep:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        if keep is not None and os.path.exists(keep):
+            total += os.path.getsize(keep)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_export_cache():
+    """Return the process-wide export cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExportCache(
+                os.environ.get("LOAN_APP_EXPORT_DIR", DEFAULT_EXPORT_DIR),
+                int(os.environ.get("LOAN_APP_EXPORT_MAX_BYTES", DEFAULT_MAX_BYTES)),
+            )
+        return _cache
+
+
+def export_to_cache(progress, key, fmt, source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """``JobQueue`` entry point: write the ``fmt`` export of ``key`` into the shared cache."""
+    return get_export_cache().export(key, fmt, source, chunk_size, progress)
@@ -0,0 +1,39 @@
+"""Vectorized feature engineering shared by the single and batch prediction paths.
+
+Each group column is defined by a sorted array of bin edges. A value falls in
+group ``i`` when it is at least ``edges[i - 1]`` and below ``edges[i]``, which
+is exactly ``np.searchsorted(edges, value, side="right")``. This replaces the
+per-row ``create_*_group`` functions that used to run through ``Series.apply``.
+"""
+import numpy as np
+import pandas as pd
+
+# Raw inputs expected from the form or from an uploaded CSV.
+INPUT_COLUMNS = ["income", "credit_score", "loan_amount", "years_employed", "points"]
+
+# IMPORTANT: same column order used during model training.
+MODEL_COLUMNS = INPUT_COLUMNS + ["credit_score_group", "points_score_group", "income_score_group"]
+
+# group column -> (source column, sorted upper bin edges)
+GROUP_BINS = {
+    "income_score_group": ("income", np.array([61000.0, 91000.0, 120000.0])),
+    "credit_score_group": ("credit_score", np.array([579.0, 669.0, 740.0])),
+    "points_score_group": ("points", np.array([30.0, 65.0])),
+}
+
+
+def assign_groups(values, edges):
+    """Return the int8 group code of every value in ``values``."""
+    return np.searchsorted(edges, values, side="right").astype(np.int8)
+
+
+def engineer_features(df):
+    """Build the model input frame from ``df`` in a single pass over float arrays.
+
+    Only the ``INPUT_COLUMNS`` of ``df`` are read; the result holds float64
+    inputs followed by the three int8 group columns, in ``MODEL_COLUMNS`` order.
+    """
+    columns = {name: np.asarray(df[name], dtype=np.float64) for name in INPUT_COLUMNS}
+    for group, (source, edges) in GROUP_BINS.items():
+        columns[group] = assign_groups(columns[source], edges)
+    return pd.DataFrame({name: columns[name] for name in MODEL_COLUMNS}, index=df.index, copy=False)
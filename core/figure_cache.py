@@ -0,0 +1,128 @@
+"""Process-wide cache of rendered charts.
+
+Charts are keyed by the dataset fingerprint, the chart type and every widget
+parameter that shapes them, and stored serialized: Plotly figures as their
+JSON with compact binary data arrays (see ``core.payload``), matplotlib
+figures as PNG bytes. Entries are evicted least recently used first once
+their total size exceeds the byte budget, so any session looking at the same
+data and selections gets the chart without rebuilding it.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from core.payload import compact_figure
+
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+
+PLOTLY = "plotly"
+PNG = "png"
+
+
+@dataclass(frozen=True)
+class CachedFigure:
+    kind: str
+    payload: bytes
+    note: str = ""
+
+    def to_plotly(self):
+        import plotly.io as pio
+
+        return pio.from_json(self.payload.decode("utf-8"))
+
+
+def figure_key(fingerprint, chart, **params):
+    """Return a stable cache key for ``chart`` of dataset ``fingerprint`` drawn with ``params``."""
+    description = json.dumps([fingerprint, chart, params], sort_keys=True, default=str)
+    return hashlib.blake2b(description.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def serialize_figure(fig, note=""):
+    """Serialize a Plotly or matplotlib figure into a ``CachedFigure``."""
+    if hasattr(fig, "to_json"):
+        return CachedFigure(PLOTLY, compact_figure(fig).to_json().encode("utf-8"), note)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", facecolor=fig.get_facecolor(), bbox_inches="tight", dpi=100)
+    return CachedFigure(PNG, buffer.getvalue(), note)
+
+
+class FigureCache:
+    """Byte-budgeted LRU of serialized figures with hit/miss counters."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        size = len(entry.payload)
+        if size > self.max_bytes:
+            return entry
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.payload)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.payload)
+                self.evictions += 1
+        return entry
+
+    def get_or_render(self, key, render):
+        """Return the cached figure for ``key``, calling ``render()`` and storing it on a miss.
+
+        ``render`` returns a figure, or a ``(figure, note)`` pair whose note
+        (e.g. a caption) is cached along with it.
+        """
+        entry = self.get(key)
+        if entry is None:
+            rendered = render()
+            fig, note = rendered if isinstance(rendered, tuple) else (rendered, "")
+            entry = self.put(key, serialize_figure(fig, note))
+        return entry
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_figure_cache():
+    """Return the process-wide figure cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = FigureCache(int(os.environ.get("LOAN_APP_FIGURE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)))
+        return _cache
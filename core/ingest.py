@@ -0,0 +1,163 @@
+"""Typed, chunked CSV ingestion for loan datasets.
+
+``pd.read_csv`` with default inference stores every number as int64/float64
+and free text as Python objects. ``read_loan_csv`` parses with a declared
+schema instead (float32 numbers, nullable boolean target, Arrow-backed or
+categorical strings) and does it chunk by chunk so progress can be reported.
+
+Files that do not fit the schema (e.g. "abc" in a numeric column or yes/no in
+the target) are re-read with those columns as text and coerced: unparseable
+numbers become missing and common boolean spellings are mapped. The coerced
+column names are stored in ``df.attrs["coerced_columns"]``.
+"""
+import pandas as pd
+
+from core.batch import iter_chunks
+
+DEFAULT_CHUNK_SIZE = 100_000
+FOOTPRINT_SAMPLE_ROWS = 100_000
+
+
+def _text_dtype():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "string"
+    return "string[pyarrow]"
+
+
+# Columns missing from a file are simply ignored by read_csv. "category"
+# columns are parsed as strings and only kept categorical when values repeat
+# enough for the codes to pay off (see ``compact_frame``); "boolean" columns
+# become plain bool when they have no missing values.
+LOAN_SCHEMA = {
+    "name": _text_dtype(),
+    "city": "category",
+    "income": "float32",
+    "credit_score": "float32",
+    "loan_amount": "float32",
+    "years_employed": "float32",
+    "points": "float32",
+    "loan_approved": "boolean",
+}
+
+# Keep a text column categorical only below this distinct/total ratio.
+MAX_CATEGORY_RATIO = 0.5
+
+# Spellings of the boolean target accepted when the strict parse fails;
+# read_csv itself only accepts true/false.
+BOOLEAN_VALUES = {
+    "true": True, "false": False, "yes": True, "no": False,
+    "y": True, "n": False, "t": True, "f": False, "1": True, "0": False,
+}
+
+
+def _parse_dtypes(schema):
+    text = _text_dtype()
+    return {column: text if dtype == "category" else dtype for column, dtype in schema.items()}
+
+
+def _fallback_dtypes(schema):
+    text = _text_dtype()
+    return {
+        column: text if dtype == "boolean" or pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(dtype)) else dtype
+        for column, dtype in _parse_dtypes(schema).items()
+    }
+
+
+def _coerce(df, schema, coerced):
+    """Convert the text-parsed typed columns of ``df`` in place, adding lossy ones to ``coerced``."""
+    fallback = _fallback_dtypes(schema)
+    for column, dtype in _parse_dtypes(schema).items():
+        if column not in df.columns or dtype == fallback[column]:
+            continue
+        raw = df[column]
+        if dtype == "boolean":
+            text = raw.str.strip().str.lower()
+            values = text.map(BOOLEAN_VALUES).astype("boolean")
+            failed = text.notna() & ~text.isin(["true", "false"])
+        else:
+            values = pd.to_numeric(raw, errors="coerce").astype(dtype)
+            failed = values.isna() & raw.notna()
+        if failed.any():
+            coerced.add(column)
+        df[column] = values
+    return df
+
+
+def _read_with_fallback(source, read, schema):
+    """Return ``(frames, coerced_columns)`` from ``read(dtype)``, coercing if the typed parse fails."""
+    try:
+        return read(_parse_dtypes(schema)), []
+    except ValueError:
+        if hasattr(source, "seek"):
+            source.seek(0)
+    coerced = set()
+    frames = [_coerce(frame, schema, coerced) for frame in read(_fallback_dtypes(schema))]
+    return frames, [column for column in schema if column in coerced]
+
+
+def compact_frame(df, schema=LOAN_SCHEMA):
+    """Apply the post-parse part of ``schema`` to ``df`` in place and return it."""
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        if dtype == "category" and len(df):
+            if df[column].nunique(dropna=True) / len(df) < MAX_CATEGORY_RATIO:
+                df[column] = df[column].astype("category")
+        elif dtype == "boolean" and not df[column].isna().any():
+            df[column] = df[column].astype(bool)
+    return df
+
+
+def read_loan_csv(source, schema=LOAN_SCHEMA, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """Parse ``source`` (path or binary stream) with ``schema`` in chunks.
+
+    ``progress`` is called with the fraction of the input consumed after each
+    chunk (it restarts from zero if the file has to be re-read for coercion).
+    """
+    def read(dtype):
+        chunks = []
+        for chunk, fraction in iter_chunks(source, chunk_size, dtype=dtype):
+            chunks.append(chunk)
+            if progress is not None:
+                progress(fraction)
+        return chunks
+
+    chunks, coerced = _read_with_fallback(source, read, schema)
+    if not chunks:
+        return pd.DataFrame(columns=list(schema)).astype(_parse_dtypes(schema))
+    df = compact_frame(pd.concat(chunks, ignore_index=True), schema)
+    if coerced:
+        df.attrs["coerced_columns"] = coerced
+    return df
+
+
+def footprint_report(source, schema=LOAN_SCHEMA, nrows=FOOTPRINT_SAMPLE_ROWS, total_rows=None):
+    """Compare per-column memory of default inference and ``schema`` on a sample.
+
+    Both parsers read the first ``nrows`` rows; bytes per row are scaled to
+    ``total_rows`` (defaults to the sample size). Returns a DataFrame with one
+    row per column plus a ``TOTAL`` row.
+    """
+    if hasattr(source, "seek"):
+        source.seek(0)
+    default = pd.read_csv(source, nrows=nrows)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    typed, _ = _read_with_fallback(source, lambda dtype: [pd.read_csv(source, nrows=nrows, dtype=dtype)], schema)
+    typed = compact_frame(typed[0], schema)
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+    scale = (total_rows or len(default)) / max(len(default), 1)
+    report = pd.DataFrame({
+        "Default dtype": default.dtypes.astype(str),
+        "Schema dtype": typed.dtypes.astype(str),
+        "Default bytes": default.memory_usage(index=False, deep=True) * scale,
+        "Schema bytes": typed.memory_usage(index=False, deep=True) * scale,
+    })
+    report.loc["TOTAL"] = ["", "", report["Default bytes"].sum(), report["Schema bytes"].sum()]
+    report[["Default bytes", "Schema bytes"]] = report[["Default bytes", "Schema bytes"]].astype("int64")
+    report["Saved"] = 1 - report["Schema bytes"] / report["Default bytes"]
+    return report
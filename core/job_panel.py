@@ -0,0 +1,73 @@
+"""Streamlit widgets for following background jobs from any page.
+
+Jobs are tagged with a per-session owner id, so every page of a session sees
+the same jobs. Progress is redrawn by fragments that rerun on a timer only
+while a job is still active; once it finishes the whole page reruns so it can
+render the result.
+"""
+import uuid
+
+import streamlit as st
+
+from core.jobs import CANCELLED, DONE, FAILED, get_job_queue
+
+POLL_SECONDS = 1.0
+SIDEBAR_JOBS = 5
+
+
+def session_owner():
+    """Return the id that tags this browser session's jobs."""
+    if "job_owner" not in st.session_state:
+        st.session_state["job_owner"] = uuid.uuid4().hex
+    return st.session_state["job_owner"]
+
+
+def describe_job(job):
+    text = f"{job.label}: {job.fraction:.0%}"
+    if job.eta is not None:
+        text += f" · about {job.eta:,.0f}s left"
+    elif not job.finished and job.started_at is None:
+        text += " · queued"
+    return text
+
+
+def _render_progress(job_id, cancel_key):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return
+    if job.finished:
+        st.rerun(scope="app")
+    st.progress(job.fraction, text=describe_job(job))
+    if st.button("✖ Cancel", key=cancel_key, disabled=job.cancel_requested):
+        job.cancel()
+
+
+def job_progress(job, key=""):
+    """Show a live progress bar with a cancel button for an unfinished job."""
+    st.fragment(_render_progress, run_every=POLL_SECONDS)(job.id, f"cancel_{key}_{job.id}")
+
+
+def _render_sidebar(owner):
+    jobs = get_job_queue().jobs(owner=owner)[:SIDEBAR_JOBS]
+    if not jobs:
+        return
+    st.markdown("#### ⚙️ Background jobs")
+    for job in jobs:
+        if job.state == DONE:
+            st.caption(f"✅ {job.label} ({job.elapsed:,.1f}s)")
+        elif job.state == FAILED:
+            st.caption(f"❌ {job.label}: {job.error}")
+        elif job.state == CANCELLED:
+            st.caption(f"⏹ {job.label} cancelled")
+        else:
+            st.progress(job.fraction, text=describe_job(job))
+            if st.button("✖ Cancel", key=f"cancel_sidebar_{job.id}", disabled=job.cancel_requested):
+                job.cancel()
+
+
+def jobs_sidebar():
+    """List this session's recent jobs in the sidebar, polling while any is active."""
+    owner = session_owner()
+    active = any(not job.finished for job in get_job_queue().jobs(owner=owner))
+    with st.sidebar:
+        st.fragment(_render_sidebar, run_every=POLL_SECONDS if active else None)(owner)
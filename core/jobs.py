@@ -0,0 +1,183 @@
+"""In-process background jobs for long computations such as batch scoring.
+
+Work submitted to the ``JobQueue`` runs on a small thread pool, outside the
+Streamlit script thread, so it survives reruns and page switches. A job
+function receives a ``progress`` callable as its first argument and should
+call it with the fraction done after every chunk; that call is also where a
+cancellation request takes effect, by raising ``JobCancelled``. Finished jobs
+are kept in a bounded store until they are evicted, oldest first.
+"""
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_RESULTS = 32
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once its cancellation has been requested."""
+
+
+class Job:
+    """State of one submitted job, updated by the worker and read by the pages."""
+
+    def __init__(self, job_id, kind, label, owner=None, cleanup=None):
+        self.id = job_id
+        self.kind = kind
+        self.label = label
+        self.owner = owner
+        self.cleanup = cleanup
+        self.state = QUEUED
+        self.fraction = 0.0
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._cancel = threading.Event()
+
+    @property
+    def finished(self):
+        return self.state in FINISHED_STATES
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def eta(self):
+        """Seconds left, extrapolated from the progress so far (None until known)."""
+        if self.state != RUNNING or self.fraction <= 0:
+            return None
+        return self.elapsed * (1 - self.fraction) / self.fraction
+
+    def progress(self, fraction):
+        """Record progress; raises ``JobCancelled`` if cancellation was requested."""
+        self.fraction = min(max(float(fraction), 0.0), 1.0)
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+
+    def cancel(self):
+        """Request cancellation; a queued job never starts, a running one stops at its next chunk."""
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self.state = CANCELLED
+            self.finished_at = time.time()
+
+
+class JobQueue:
+    """Thread pool running jobs plus a bounded store of their outcomes."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_results=DEFAULT_MAX_RESULTS):
+        self.max_results = max_results
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="loan-job")
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, kind="job", label="", owner=None, cleanup=None, **kwargs):
+        """Run ``fn(progress, *args, **kwargs)`` in the background and return its ``Job``.
+
+        ``cleanup(result)`` is called when a finished job is evicted from the
+        store, e.g. to delete a result file.
+        """
+        with self._lock:
+            job = Job(f"{kind}-{next(self._ids)}", kind, label, owner, cleanup)
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job, fn, args, kwargs)
+        self._evict()
+        return job
+
+    @staticmethod
+    def _run(job, fn, args, kwargs):
+        if job.cancel_requested:
+            job.state = CANCELLED
+            job.finished_at = time.time()
+            return
+        job.started_at = time.time()
+        job.state = RUNNING
+        try:
+            job.result = fn(job.progress, *args, **kwargs)
+        except JobCancelled:
+            job.state = CANCELLED
+        except Exception as exc:
+            job.error = exc
+            job.state = FAILED
+        else:
+            job.fraction = 1.0
+            job.state = DONE
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, owner=None, kind=None):
+        """Return the stored jobs, newest first, optionally filtered by owner and kind."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [
+            job for job in reversed(jobs)
+            if (owner is None or job.owner == owner) and (kind is None or job.kind == kind)
+        ]
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def _evict(self):
+        """Drop the oldest finished jobs beyond ``max_results``; unfinished jobs are kept."""
+        with self._lock:
+            finished = [job for job in self._jobs.values() if job.finished]
+            evicted = finished[:max(0, len(self._jobs) - self.max_results)]
+            for job in evicted:
+                del self._jobs[job.id]
+        for job in evicted:
+            if job.cleanup is not None and job.result is not None:
+                try:
+                    job.cleanup(job.result)
+                except OSError:
+                    pass
+
+    def shutdown(self, cancel=True):
+        if cancel:
+            for job in self.jobs():
+                job.cancel()
+        self._executor.shutdown(wait=False)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide job queue."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(
+                int(os.environ.get("LOAN_APP_JOB_WORKERS", DEFAULT_WORKERS)),
+                int(os.environ.get("LOAN_APP_JOB_RESULTS", DEFAULT_MAX_RESULTS)),
+            )
+        return _queue
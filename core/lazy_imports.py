@@ -0,0 +1,39 @@
+"""Deferred imports for heavy plotting libraries.
+
+``lazy_import("plotly.express")`` returns a stand-in that imports the real
+module on first attribute access, so a page only pays for matplotlib, seaborn
+or plotly when a chart that needs them is actually drawn.
+"""
+import importlib
+import sys
+import threading
+
+
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def is_loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    """Return ``name`` itself if already imported, otherwise a ``LazyModule``."""
+    return sys.modules.get(name) or LazyModule(name)
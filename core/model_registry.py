@@ -0,0 +1,218 @@
+"""Process-wide registry for the trained loan approval pipeline.
+
+Streamlit re-executes page scripts on every widget interaction, so the
+pipeline must not be unpickled inside the script body. The registry loads it
+once per server process, runs a warm-up prediction, and hot-swaps it when the
+artifact on disk changes.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+
+from core.features import engineer_features
+
+DEFAULT_MODEL_PATH = "loan_approval_pipeline.pkl"
+COMPILED_MODEL_PATH = "loan_approval_pipeline.npz"
+# Loads retried when the artifact changes while it is being read.
+LOAD_ATTEMPTS = 3
+
+logger = logging.getLogger(__name__)
+
+# A plausible applicant used to exercise the whole pipeline once at load time.
+WARMUP_ROW = {
+    "income": 75000.0,
+    "credit_score": 650.0,
+    "loan_amount": 100000.0,
+    "years_employed": 5.0,
+    "points": 50.0,
+}
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """An immutable snapshot of a loaded model and the artifact it came from."""
+
+    model: object
+    path: str
+    checksum: str
+    mtime: float
+    size: int
+    loaded_at: float
+    warmup_seconds: float
+
+
+def file_checksum(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_model(path):
+    """Load a compiled ``.npz`` model or a joblib-pickled pipeline."""
+    if str(path).endswith(".npz"):
+        from core.compiled_model import CompiledPipeline
+
+        return CompiledPipeline.load(path)
+    import joblib
+
+    return joblib.load(path)
+
+
+_stat_cache = {}
+_stat_cache_lock = threading.Lock()
+
+
+def _cached_by_stat(path, compute):
+    """Return ``compute(path)``, recomputed only when the file's stat changes."""
+    stat = os.stat(path)
+    key = (os.path.abspath(path), compute.__name__)
+    signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    with _stat_cache_lock:
+        cached = _stat_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    value = compute(path)
+    with _stat_cache_lock:
+        _stat_cache[key] = (signature, value)
+    return value
+
+
+def resolve_model_path(path=DEFAULT_MODEL_PATH, compiled_path=COMPILED_MODEL_PATH):
+    """Prefer the compiled export of ``path`` when it was exported from the current ``path``.
+
+    The compiled model avoids importing xgboost and scikit-learn, which
+    dominates the cold start of the prediction page. The export records the
+    SHA-256 of its source pickle; if that no longer matches (or was not
+    recorded), the pickle is served so a replaced model is never shadowed.
+    """
+    try:
+        from core.compiled_model import source_checksum
+
+        if _cached_by_stat(compiled_path, source_checksum) == _cached_by_stat(path, file_checksum):
+            return compiled_path
+    except Exception:
+        # A missing or unreadable export (or pickle) falls back to the pickle path.
+        pass
+    return path
+
+
+class ModelRegistry:
+    """Holds the current model snapshot and replaces it atomically.
+
+    Readers only ever see a fully loaded and warmed-up ``LoadedModel``: a new
+    artifact is loaded into a local variable and published with a single
+    reference assignment. Reloads are serialized by a lock so concurrent
+    sessions that notice the same change do not load it twice.
+    """
+
+    def __init__(self, path=DEFAULT_MODEL_PATH, loader=load_model, check_interval=2.0):
+        self.path = path
+        self.loader = loader
+        self.check_interval = check_interval
+        self._current = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def current(self):
+        return self._current
+
+    def get(self):
+        """Return the current ``LoadedModel``, reloading it if the artifact changed.
+
+        If a reload fails (e.g. on a half-copied file) the last good snapshot
+        keeps being served and the reload is retried at the next check.
+        """
+        snapshot = self._current
+        now = time.monotonic()
+        if snapshot is not None and now - self._last_check < self.check_interval:
+            return snapshot
+        self._last_check = now
+        if snapshot is None or self._artifact_changed(snapshot):
+            try:
+                return self.reload()
+            except Exception:
+                if snapshot is None:
+                    raise
+                logger.exception("Reloading %s failed; still serving checksum %s", self.path, snapshot.checksum)
+        return snapshot
+
+    def reload(self, force=False):
+        with self._lock:
+            snapshot = self._current
+            stat = os.stat(self.path)
+            if snapshot is not None and not force:
+                if (stat.st_mtime, stat.st_size) == (snapshot.mtime, snapshot.size):
+                    return snapshot
+                checksum = file_checksum(self.path)
+                if checksum == snapshot.checksum:
+                    # Touched but identical: remember the new stat, keep the model.
+                    self._current = LoadedModel(
+                        snapshot.model, snapshot.path, checksum, stat.st_mtime,
+                        stat.st_size, snapshot.loaded_at, snapshot.warmup_seconds,
+                    )
+                    return self._current
+
+            model, checksum, stat = self._load_stable()
+            warmup_seconds = warm_up(model)
+            self._current = LoadedModel(
+                model=model,
+                path=self.path,
+                checksum=checksum,
+                mtime=stat.st_mtime,
+                size=stat.st_size,
+                loaded_at=time.time(),
+                warmup_seconds=warmup_seconds,
+            )
+            return self._current
+
+    def _load_stable(self):
+        """Load the artifact and return ``(model, checksum, stat)`` describing the same bytes.
+
+        The file is stat'ed before hashing and again after loading; if it
+        changed in between, the load is repeated.
+        """
+        for _ in range(LOAD_ATTEMPTS):
+            stat = os.stat(self.path)
+            checksum = file_checksum(self.path)
+            model = self.loader(self.path)
+            after = os.stat(self.path)
+            if (after.st_mtime, after.st_size) == (stat.st_mtime, stat.st_size):
+                return model, checksum, stat
+        raise RuntimeError(f"{self.path} kept changing while it was being loaded")
+
+    def _artifact_changed(self, snapshot):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            # Keep serving the last good model if the file is being replaced.
+            return False
+        return (stat.st_mtime, stat.st_size) != (snapshot.mtime, snapshot.size)
+
+
+def warm_up(model):
+    """Run one prediction so lazy initialisation is paid at load time."""
+    start = time.perf_counter()
+    model.predict_proba(engineer_features(pd.DataFrame([WARMUP_ROW])))
+    return time.perf_counter() - start
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(path=DEFAULT_MODEL_PATH):
+    """Return the process-wide registry for ``path``."""
+    key = os.path.abspath(path)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = ModelRegistry(path)
+        return registry
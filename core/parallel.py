@@ -0,0 +1,226 @@
+"""Opt-in multi-core scoring over shared-memory feature matrices.
+
+``ParallelScorer`` looks like a model: its ``predict_proba`` copies the
+engineered feature matrix once into a shared-memory block, fans contiguous row
+slices out to a pool of worker processes that have the pipeline preloaded, and
+collects the probabilities from a second shared block. Workers only exchange
+slice bounds with the parent, never per-row objects.
+
+The pool respects a global thread budget: each worker gets
+``budget // workers`` threads for XGBoost/OpenMP/BLAS so the pool as a whole
+never oversubscribes the machine, and ``get_parallel_scorer`` splits one
+budget across the pools of every model in use.
+"""
+import os
+import threading
+from collections import OrderedDict
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from core.batch import score_to_temp_file
+from core.workers import WorkerPool
+
+MIN_SLICE_ROWS = 2_048
+
+_worker_model = None
+
+
+def default_thread_budget():
+    return os.cpu_count() or 1
+
+
+def start_process_pool(workers, initializer=None, initargs=()):
+    """Return a pool of ``workers`` fresh interpreters, all initialised and running.
+
+    Workers are separate processes (forking a threaded server is unsafe)
+    started through the ``core.workers`` entry point, so they never import a
+    page script.
+    """
+    return WorkerPool(workers, initializer, initargs)
+
+
+def _limit_threads(model, threads):
+    steps = getattr(model, "steps", [(None, model)])
+    for _, estimator in steps:
+        if "n_jobs" in getattr(estimator, "get_params", dict)():
+            estimator.set_params(n_jobs=threads)
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(threads)
+
+
+def _init_worker(model_path, threads):
+    global _worker_model
+    # Must be set before xgboost/OpenMP are imported in this fresh process.
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    from core.model_registry import load_model, warm_up
+
+    _worker_model = load_model(model_path)
+    _limit_threads(_worker_model, threads)
+    warm_up(_worker_model)
+
+
+def _attach(name):
+    """Open a block created by the parent without tracking it in this worker.
+
+    The parent creates and unlinks every block; a worker's own resource tracker
+    would otherwise unlink them again at worker exit and warn about leaks.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            from multiprocessing import resource_tracker
+
+            resource_tracker.unregister("/" + shm.name, "shared_memory")
+        return shm
+
+
+def _score_slice(in_name, out_name, shape, columns, start, stop):
+    features_shm = _attach(in_name)
+    output_shm = _attach(out_name)
+    try:
+        features = np.ndarray(shape, dtype=np.float64, buffer=features_shm.buf)
+        output = np.ndarray((shape[0], 2), dtype=np.float64, buffer=output_shm.buf)
+        frame = pd.DataFrame(features[start:stop], columns=columns, copy=False)
+        output[start:stop] = _worker_model.predict_proba(frame)
+        del features, output, frame
+    finally:
+        features_shm.close()
+        output_shm.close()
+    return stop - start
+
+
+class ParallelScorer:
+    """A process pool with a preloaded pipeline that scores row slices in parallel."""
+
+    def __init__(self, model_path, workers, thread_budget=None, checksum=None):
+        budget = thread_budget or default_thread_budget()
+        self.model_path = os.path.abspath(model_path)
+        self.checksum = checksum
+        self.workers = max(1, int(workers))
+        self.threads_per_worker = max(1, budget // self.workers)
+        self.classes_ = np.array([0, 1])
+        self._pool = start_process_pool(self.workers, _init_worker, (self.model_path, self.threads_per_worker))
+        self._leases = 0
+        self._retired = False
+        self._lease_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def acquire(self):
+        """Take a lease: the pool stays up until every lease is released, even once retired."""
+        with self._lease_lock:
+            self._leases += 1
+        return self
+
+    def release(self):
+        with self._lease_lock:
+            self._leases -= 1
+            drain = self._retired and self._leases == 0
+        if drain:
+            self._drain()
+
+    def retire(self):
+        """Shut the pool down once its last lease is released."""
+        with self._lease_lock:
+            self._retired = True
+            drain = self._leases == 0
+        if drain:
+            self._drain()
+
+    def _drain(self):
+        # In the background so the caller never waits for another batch's slices.
+        threading.Thread(target=self.shutdown, kwargs={"wait": True}, daemon=True).start()
+
+    def predict_proba(self, features):
+        n_rows = len(features)
+        if n_rows == 0:
+            return np.empty((0, 2))
+        columns = list(features.columns)
+        shape = (n_rows, len(columns))
+        features_shm = shared_memory.SharedMemory(create=True, size=8 * shape[0] * shape[1])
+        output_shm = shared_memory.SharedMemory(create=True, size=8 * n_rows * 2)
+        try:
+            matrix = np.ndarray(shape, dtype=np.float64, buffer=features_shm.buf)
+            matrix[:] = features.to_numpy(dtype=np.float64)
+            del matrix
+            slice_rows = max(MIN_SLICE_ROWS, -(-n_rows // self.workers))
+            futures = [
+                self._pool.submit(_score_slice, features_shm.name, output_shm.name, shape, columns,
+                                  start, min(start + slice_rows, n_rows))
+                for start in range(0, n_rows, slice_rows)
+            ]
+            for future in futures:
+                future.result()
+            return np.ndarray((n_rows, 2), dtype=np.float64, buffer=output_shm.buf).copy()
+        finally:
+            for shm in (features_shm, output_shm):
+                shm.close()
+                shm.unlink()
+
+    def warm_up(self):
+        """Start every worker and load the pipeline before the first real batch."""
+        for future in [self._pool.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+
+    @property
+    def threads(self):
+        return self.workers * self.threads_per_worker
+
+    def shutdown(self, wait=False):
+        """Stop the workers; with ``wait`` queued slices finish first, otherwise they are cancelled."""
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+MAX_SCORERS = int(os.environ.get("LOAN_APP_MAX_SCORERS", 2))
+
+_scorers = OrderedDict()
+_scorers_lock = threading.Lock()
+
+
+def get_parallel_scorer(snapshot, workers, thread_budget=None):
+    """Return the process-wide scorer for a registry ``LoadedModel`` snapshot.
+
+    There is one pool per model file, kept for at most ``MAX_SCORERS`` files
+    (least recently used first out). The pools share ``thread_budget`` (all
+    cores by default): a pool only gets the threads the others leave free, and
+    is rebuilt when the model checksum or the worker count changes.
+
+    The returned scorer is leased to the caller, who must ``release()`` it
+    (or use it as a context manager). Replaced and evicted pools keep serving
+    their leases and only shut down after the last one is released.
+    """
+    key = os.path.abspath(snapshot.path)
+    budget = thread_budget or default_thread_budget()
+    with _scorers_lock:
+        scorer = _scorers.pop(key, None)
+        while len(_scorers) >= MAX_SCORERS:
+            _scorers.popitem(last=False)[1].retire()
+        free = max(1, budget - sum(other.threads for other in _scorers.values()))
+        workers = min(max(1, int(workers)), free)
+        if scorer is not None and (
+            scorer.checksum != snapshot.checksum or scorer.workers != workers or scorer.threads > free
+        ):
+            scorer.retire()
+            scorer = None
+        if scorer is None:
+            scorer = ParallelScorer(snapshot.path, workers, free, snapshot.checksum)
+        _scorers[key] = scorer
+        return scorer.acquire()
+
+
+def score_in_parallel(progress, snapshot, workers, source, **kwargs):
+    """``JobQueue`` entry point: ``score_to_temp_file`` on a scorer leased for the whole job."""
+    with get_parallel_scorer(snapshot, workers) as scorer:
+        return score_to_temp_file(progress, scorer, source, **kwargs)
@@ -0,0 +1,105 @@
+"""Compact binary arrays for Plotly figures sent to the browser.
+
+Plotly already ships numpy arrays as base64 typed arrays, but keeps their
+dtype: float64 coordinates cost 8 bytes a value, and plain Python lists are
+written as JSON text. ``compact_figure`` rewrites every numeric data array of
+a figure's traces to the narrowest type that draws the same chart:
+
+* whole numbers (counts, scores, integer-valued floats) become the smallest
+  integer type that holds them exactly (int8 up to int32);
+* other floats become float32, whose ~7 significant digits are far below
+  the resolution of any axis on screen.
+
+Strings, mixed columns and short arrays (e.g. a pie's domain) are left alone.
+"""
+import base64
+
+import numpy as np
+
+# Arrays shorter than this are not worth a base64 blob.
+MIN_COMPACT_LENGTH = 16
+FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+_INTEGER_TYPES = [np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32]
+_SHORT_TYPES = {
+    "int8": "i1", "uint8": "u1", "int16": "i2", "uint16": "u2",
+    "int32": "i4", "uint32": "u4", "float32": "f4", "float64": "f8",
+}
+_DTYPES = {short: np.dtype(name) for name, short in _SHORT_TYPES.items()}
+
+
+def _decode(value):
+    """Return ``value`` as a numeric numpy array, or None if it is not a compactable array."""
+    if isinstance(value, dict) and "bdata" in value and value.get("dtype") in _DTYPES:
+        array = np.frombuffer(base64.b64decode(value["bdata"]), dtype=_DTYPES[value["dtype"]])
+        if "shape" in value:
+            array = array.reshape([int(size) for size in str(value["shape"]).split(",")])
+        return array
+    if isinstance(value, (list, tuple)):
+        if len(value) < MIN_COMPACT_LENGTH or any(
+            isinstance(item, bool) or not isinstance(item, (int, float)) for item in value
+        ):
+            return None
+        return np.asarray(value, dtype=np.float64)
+    if isinstance(value, np.ndarray) and value.dtype.kind in "iuf":
+        return value
+    return None
+
+
+def _narrow_integers(array):
+    """Return whole-number ``array`` as the smallest integer type holding it, or None if none does."""
+    low, high = array.min(), array.max()
+    for dtype in _INTEGER_TYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return array.astype(dtype) if np.dtype(dtype).itemsize < array.dtype.itemsize else array
+    return None
+
+
+def compact_array(array):
+    """Return ``array`` in the narrowest dtype that keeps the picture the same."""
+    if array.dtype.kind in "iu":
+        narrowed = _narrow_integers(array)
+        return array if narrowed is None else narrowed
+    finite = np.isfinite(array)
+    if finite.all() and np.array_equal(array, np.round(array)):
+        narrowed = _narrow_integers(array)
+        if narrowed is not None:
+            return narrowed
+    if array.dtype.itemsize > 4 and np.abs(array[finite]).max(initial=0) <= FLOAT32_MAX:
+        return array.astype(np.float32)
+    return array
+
+
+def typed_array_spec(array):
+    """Return the plotly.js typed array description of a numeric numpy array."""
+    array = np.ascontiguousarray(array)
+    spec = {"dtype": _SHORT_TYPES[str(array.dtype)], "bdata": base64.b64encode(array.tobytes()).decode("ascii")}
+    if array.ndim > 1:
+        spec["shape"] = ", ".join(str(size) for size in array.shape)
+    return spec
+
+
+def _compact_paths(node, path=()):
+    """Yield ``(path, spec)`` for every data array under ``node`` that gets smaller."""
+    for key, value in node.items():
+        if key == "type":
+            continue
+        if isinstance(value, dict) and "bdata" not in value:
+            yield from _compact_paths(value, path + (key,))
+            continue
+        array = _decode(value)
+        if array is None or array.size < MIN_COMPACT_LENGTH:
+            continue
+        compacted = compact_array(array)
+        if isinstance(value, (dict, np.ndarray)) and compacted.dtype == array.dtype:
+            continue
+        yield path + (key,), typed_array_spec(compacted)
+
+
+def compact_figure(fig):
+    """Rewrite the numeric data arrays of ``fig``'s traces in place; return ``fig``."""
+    for trace in fig.data:
+        for path, spec in list(_compact_paths(trace.to_plotly_json())):
+            trace[".".join(path)] = spec
+    return fig
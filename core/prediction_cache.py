@@ -0,0 +1,96 @@
+"""Memoization of model probabilities per engineered feature vector.
+
+Entries are keyed by a BLAKE2 digest of the float64 feature row together with
+the checksum of the model that produced it, so a hot-swapped model never
+serves stale probabilities. The cache is a size-bounded LRU and keeps hit,
+miss and eviction counters.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MAX_ENTRIES = 100_000
+
+
+def row_keys(matrix, model_key):
+    """Return one 16-byte digest per row of the float64 ``matrix``."""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+    salt = model_key.encode("utf-8")[:16] if isinstance(model_key, str) else bytes(model_key)[:16]
+    return [hashlib.blake2b(row.tobytes(), digest_size=16, salt=salt.ljust(16, b"\0")).digest()
+            for row in matrix]
+
+
+class PredictionCache:
+    """Thread-safe LRU mapping feature-row digests to class probabilities."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def lookup(self, keys):
+        """Return cached probability rows for ``keys``, ``None`` where missing."""
+        found = []
+        with self._lock:
+            for key in keys:
+                value = self._entries.get(key)
+                if value is None:
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                found.append(value)
+        return found
+
+    def store(self, keys, probabilities):
+        # Own copies: a view would keep the whole batch's array alive for as
+        # long as any one of its rows stays cached.
+        rows = [row.copy() for row in probabilities]
+        with self._lock:
+            for key, row in zip(keys, rows):
+                self._entries[key] = row
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_prediction_cache():
+    """Return the process-wide prediction cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PredictionCache()
+        return _cache
@@ -0,0 +1,195 @@
+"""Server-side filtering, sorting and pagination for the data preview.
+
+Only the rows of the requested page are materialized as a DataFrame; the
+filtering and ordering happen on arrays of row positions. Every numeric
+column gets a sorted index the first time it is filtered or sorted on: the
+stable argsort of its values plus the values in that order. A range filter is
+then two binary searches, and sorting a filtered subset is a gather of
+precomputed ranks followed by an argsort of the subset only.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PAGE_SIZE = 50
+MAX_CACHED_QUERIES = 16
+MAX_ENGINES = 4
+
+
+@dataclass(frozen=True)
+class PreviewQuery:
+    """Filters and ordering of a preview.
+
+    ``ranges`` holds ``(column, low, high)`` triples (inclusive, ``None`` for
+    an open end) and ``text`` holds ``(column, substring)`` pairs matched
+    case-insensitively. Tuples keep the query hashable so its result can be
+    cached while the user pages through it.
+    """
+
+    ranges: tuple = ()
+    text: tuple = ()
+    sort_by: str = None
+    ascending: bool = True
+
+
+@dataclass(frozen=True)
+class PreviewPage:
+    frame: pd.DataFrame
+    total_rows: int
+    page: int
+    pages: int
+    first_row: int
+
+
+@dataclass(frozen=True)
+class SortedIndex:
+    order: np.ndarray
+    values: np.ndarray
+    ranks: np.ndarray
+
+    def bounds(self, low, high):
+        """Return the rank interval ``[start, stop)`` of values in ``[low, high]``."""
+        start = 0 if low is None else int(np.searchsorted(self.values, low, side="left"))
+        stop = len(self.values) if high is None else int(np.searchsorted(self.values, high, side="right"))
+        return start, stop
+
+    def between(self, low, high):
+        """Row positions whose value lies in ``[low, high]``, in ascending value order."""
+        start, stop = self.bounds(low, high)
+        return self.order[start:stop]
+
+
+def _is_sortable_numeric(series):
+    return pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series)
+
+
+class PreviewEngine:
+    """Filter, sort and page one read-only DataFrame."""
+
+    def __init__(self, df):
+        self.df = df
+        self._indexes = {}
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def sorted_index(self, column):
+        """Return the ``SortedIndex`` of a numeric column, building it on first use."""
+        with self._lock:
+            index = self._indexes.get(column)
+        if index is not None:
+            return index
+        values = self.df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        # NaN sorts last, so open-ended range searches never include missing values.
+        order = np.argsort(values, kind="stable")
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = np.arange(len(order))
+        index = SortedIndex(order=order, values=values[order], ranks=ranks)
+        with self._lock:
+            return self._indexes.setdefault(column, index)
+
+    def _text_mask(self, column, positions, needle):
+        series = self.df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Match against the few distinct categories, then select rows by code.
+            categories = series.cat.categories.astype(str)
+            hits = np.flatnonzero(categories.str.contains(needle, case=False, regex=False))
+            codes = series.cat.codes.to_numpy()
+            codes = codes if positions is None else codes[positions]
+            return np.isin(codes, hits)
+        if positions is not None:
+            series = series.iloc[positions]
+        return series.astype(str).str.contains(needle, case=False, regex=False).to_numpy(dtype=bool, na_value=False)
+
+    def filter(self, query):
+        """Return the row positions matching ``query`` in display order."""
+        with self._lock:
+            if query in self._results:
+                self._results.move_to_end(query)
+                return self._results[query]
+
+        positions = None
+        ranges = [(column, low, high) for column, low, high in query.ranges if low is not None or high is not None]
+        if ranges:
+            # Start from the most selective range, then check the others row by row.
+            candidates = [self.sorted_index(column).between(low, high) for column, low, high in ranges]
+            first = int(np.argmin([len(candidate) for candidate in candidates]))
+            positions = np.sort(candidates[first])
+            for i, (column, low, high) in enumerate(ranges):
+                if i == first or len(positions) == 0:
+                    continue
+                index = self.sorted_index(column)
+                start, stop = index.bounds(low, high)
+                ranks = index.ranks[positions]
+                positions = positions[(ranks >= start) & (ranks < stop)]
+
+        for column, needle in query.text:
+            if not needle:
+                continue
+            mask = self._text_mask(column, positions, needle)
+            positions = np.flatnonzero(mask) if positions is None else positions[mask]
+
+        positions = self._order(positions, query.sort_by, query.ascending)
+        with self._lock:
+            self._results[query] = positions
+            while len(self._results) > MAX_CACHED_QUERIES:
+                self._results.popitem(last=False)
+        return positions
+
+    def _order(self, positions, sort_by, ascending):
+        n_rows = len(self.df)
+        if sort_by is None:
+            order = np.arange(n_rows) if positions is None else positions
+            return order if ascending else order[::-1]
+        # Both directions match DataFrame.sort_values(kind="stable", na_position="last"):
+        # ties keep row order and missing values come last.
+        if _is_sortable_numeric(self.df[sort_by]):
+            index = self.sorted_index(sort_by)
+            if ascending:
+                if positions is None:
+                    return index.order
+                return positions[np.argsort(index.ranks[positions], kind="stable")]
+            positions = np.arange(n_rows) if positions is None else positions
+            values = index.values[index.ranks[positions]]
+            return positions[np.lexsort((positions, -values, np.isnan(values)))]
+        positions = None if positions is None else np.sort(positions)
+        series = self.df[sort_by] if positions is None else self.df[sort_by].iloc[positions]
+        subset_order = np.asarray(
+            series.reset_index(drop=True).sort_values(ascending=ascending, kind="stable", na_position="last").index
+        )
+        return subset_order if positions is None else positions[subset_order]
+
+    def page(self, query=PreviewQuery(), page=1, page_size=DEFAULT_PAGE_SIZE, columns=None):
+        """Return page ``page`` (1-based) of the rows matching ``query``."""
+        positions = self.filter(query)
+        total = len(positions)
+        pages = max(1, -(-total // page_size))
+        page = min(max(1, int(page)), pages)
+        start = (page - 1) * page_size
+        rows = positions[start:start + page_size]
+        frame = self.df.iloc[rows]
+        return PreviewPage(
+            frame=frame if columns is None else frame[list(columns)],
+            total_rows=total,
+            page=page,
+            pages=pages,
+            first_row=start + 1 if total else 0,
+        )
+
+
+_engines = OrderedDict()
+_engines_lock = threading.Lock()
+
+
+def get_preview_engine(key, df):
+    """Return the process-wide preview engine of the dataset with fingerprint ``key``."""
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = PreviewEngine(df)
+        _engines.move_to_end(key)
+        while len(_engines) > MAX_ENGINES:
+            _engines.popitem(last=False)
+        return engine
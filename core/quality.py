@@ -0,0 +1,122 @@
+"""Single-pass data-quality report for uploaded loan datasets.
+
+Every column is converted to a NumPy array once and all statistics for it are
+derived from that array: null counts, the ``describe()`` figures, range
+violations and its contribution to a 64-bit row hash used to count duplicate
+rows. Text columns are hashed through their factorized integer codes, which is
+far cheaper than hashing every string.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+TARGET_COLUMN = "loan_approved"
+
+# column -> (lowest valid value, highest valid value); None means unbounded.
+VALID_RANGES = {
+    "credit_score": (300, 850),
+    "points": (0, 100),
+    "income": (0, None),
+    "loan_amount": (0, None),
+    "years_employed": (0, None),
+}
+
+DESCRIBE_ROWS = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+
+@dataclass(frozen=True)
+class QualityReport:
+    rows: int
+    columns: int
+    null_counts: pd.Series
+    duplicate_rows: int
+    out_of_range: pd.DataFrame
+    class_balance: pd.Series
+    approved: int
+    describe: pd.DataFrame
+    dtype_summary: pd.DataFrame
+
+    @property
+    def missing_values(self):
+        return int(self.null_counts.sum())
+
+
+def _numeric_stats(values):
+    """Return the ``describe()`` column of a float array containing NaNs for nulls."""
+    valid = values[~np.isnan(values)]
+    if len(valid) == 0:
+        return [0.0] + [np.nan] * 7
+    q25, q50, q75 = np.percentile(valid, [25, 50, 75])
+    std = valid.std(ddof=1) if len(valid) > 1 else np.nan
+    return [float(len(valid)), valid.mean(), std, valid.min(), q25, q50, q75, valid.max()]
+
+
+_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+
+
+def _fold_hash(row_hash, values):
+    column_hash = pd.util.hash_array(values, categorize=False)
+    if row_hash is None:
+        return column_hash
+    return row_hash * _HASH_MULTIPLIER ^ column_hash
+
+
+def quality_report(df, valid_ranges=VALID_RANGES):
+    """Compute the full quality report of ``df``."""
+    n_rows = len(df)
+    null_counts, describe, range_rows = {}, {}, []
+    row_hash = None
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            nulls = np.isnan(values)
+            null_counts[column] = int(nulls.sum())
+            row_hash = _fold_hash(row_hash, values)
+            describe[column] = _numeric_stats(values)
+            if column in valid_ranges:
+                low, high = valid_ranges[column]
+                too_low = int((values < low).sum()) if low is not None else 0
+                too_high = int((values > high).sum()) if high is not None else 0
+                range_rows.append({
+                    "Column": column,
+                    "Valid range": f"{low if low is not None else '-inf'} .. {high if high is not None else 'inf'}",
+                    "Below": too_low,
+                    "Above": too_high,
+                    "Out of range": too_low + too_high,
+                })
+        else:
+            # Factorize codes are -1 for missing values, so nulls come for free.
+            codes = series.cat.codes.to_numpy() if isinstance(series.dtype, pd.CategoricalDtype) \
+                else pd.factorize(series)[0]
+            null_counts[column] = int((codes == -1).sum())
+            row_hash = _fold_hash(row_hash, codes.astype(np.int64))
+
+    null_counts = pd.Series(null_counts, dtype="int64")
+    duplicate_rows = int(pd.Series(row_hash).duplicated().sum()) if n_rows and row_hash is not None else 0
+
+    if TARGET_COLUMN in df.columns:
+        class_balance = df[TARGET_COLUMN].value_counts(dropna=False)
+        approved = int((df[TARGET_COLUMN] == 1).sum())
+    else:
+        class_balance = pd.Series(dtype="int64")
+        approved = 0
+
+    dtype_summary = pd.DataFrame({
+        "Column": df.columns,
+        "Data Type": df.dtypes.astype(str).to_numpy(),
+        "Non-Null Count": (n_rows - null_counts).to_numpy(),
+        "Null Count": null_counts.to_numpy(),
+    })
+    return QualityReport(
+        rows=n_rows,
+        columns=len(df.columns),
+        null_counts=null_counts,
+        duplicate_rows=duplicate_rows,
+        out_of_range=pd.DataFrame(range_rows, columns=["Column", "Valid range", "Below", "Above", "Out of range"]),
+        class_balance=class_balance,
+        approved=approved,
+        describe=pd.DataFrame(describe, index=DESCRIBE_ROWS),
+        dtype_summary=dtype_summary,
+    )
@@ -0,0 +1,312 @@
+"""Static HTML report with every chart of the visualization page.
+
+Building a report has three stages:
+
+1. Aggregate, once, in this process. This produces the display groups and
+   their cube, one density grid per column pair, and one set of violin
+   summaries and one prepared histogram per column. Every chart reads from
+   these small results; none of them rescans the rows.
+2. Render in a pool of worker processes. The workers use matplotlib's
+   headless Agg backend. Each worker gets only the aggregates its chart
+   needs. It returns a serialized figure: Plotly JSON or PNG bytes.
+3. Assemble a single self-contained HTML file. plotly.js is inlined once,
+   and PNGs are embedded as data URIs. The footer lists the time spent in
+   each stage.
+
+Usage: python -m core.report loans.csv -o report.html [--columns income points] [--workers 2]
+"""
+import argparse
+import base64
+import html
+import itertools
+import json
+import os
+import time
+from dataclasses import dataclass, replace
+
+from core.cube import countplot_figure, donut_figure, get_cube
+from core.density import density_figure, scatter_density
+from core.figure_cache import PLOTLY, serialize_figure
+from core.histogram import bin_counts, histogram_figure, prepare_column
+from core.parallel import start_process_pool
+from core.violin import violin_figure, violin_summaries
+
+TARGET_COLUMN = "loan_approved"
+HISTOGRAM_BINS = 50
+CHART_HEIGHT = 500
+HOVER_COLUMNS = 5
+
+SECTIONS = {
+    "scatter": "📍 Scatter Plots",
+    "violin": "🎻 Violin Plots",
+    "histogram": "📊 Histograms",
+    "donut": "🍩 Donut Charts",
+    "countplot": "📶 Countplots",
+}
+
+_RENDERERS = {
+    "scatter": density_figure,
+    "violin": violin_figure,
+    "histogram": histogram_figure,
+    "donut": donut_figure,
+    "countplot": countplot_figure,
+}
+
+
+@dataclass(frozen=True)
+class ChartTask:
+    kind: str
+    title: str
+    arguments: dict
+    note: str = ""
+
+
+@dataclass(frozen=True)
+class RenderedChart:
+    kind: str
+    title: str
+    figure: object
+    seconds: float
+
+
+def _init_worker():
+    # Must be set before matplotlib is first imported in this fresh process.
+    os.environ["MPLBACKEND"] = "Agg"
+
+
+def render_chart(task):
+    """Draw and serialize one chart; runs inside a worker process."""
+    started = time.perf_counter()
+    fig = _RENDERERS[task.kind](**task.arguments)
+    if hasattr(fig, "update_layout"):
+        fig.update_layout(height=CHART_HEIGHT)
+    return RenderedChart(task.kind, task.title, serialize_figure(fig, task.note), time.perf_counter() - started)
+
+
+def default_columns(df):
+    """Numeric columns of ``df`` other than the approval target."""
+    return [column for column in df.select_dtypes(include="number").columns if column != TARGET_COLUMN]
+
+
+def plan_charts(df, columns, category=TARGET_COLUMN, bins=HISTOGRAM_BINS, key=None, timings=None):
+    """Compute every aggregate once and return the chart tasks drawn from them.
+
+    ``timings`` (a dict), when given, receives the seconds spent per aggregate.
+    """
+    timings = {} if timings is None else timings
+    tasks = []
+    has_target = TARGET_COLUMN in df.columns
+
+    started = time.perf_counter()
+    for x, y in itertools.combinations(columns, 2):
+        grid, sample = scatter_density(df, x, y, weight_column=TARGET_COLUMN)
+        # Only the hover columns of the sample are shipped to the worker.
+        hover_columns = [column for column in df.columns[:HOVER_COLUMNS] if column not in (x, y)]
+        tasks.append(ChartTask("scatter", f"{y} vs {x}", {
+            "grid": grid,
+            "sample": sample[[x, y] + hover_columns],
+            "x": x,
+            "y": y,
+            "hover_columns": hover_columns,
+            "title": f"Scatter Plot: {y} vs {x}",
+        }, f"{len(df):,} rows aggregated into a {len(grid.x_centers)}×{len(grid.y_centers)} grid"))
+    timings["aggregate: density grids"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if category in df.columns:
+        for column in columns:
+            if column == category:
+                continue
+            summaries, hidden = violin_summaries(df, category, column)
+            note = f"{hidden:,} smaller categories hidden" if hidden else ""
+            tasks.append(ChartTask("violin", f"{column} by {category}", {
+                "summaries": summaries, "x": category, "y": column, "title": f"Violin Plot: {column} by {category}",
+            }, note))
+    timings["aggregate: violin summaries"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for column in columns:
+        prepared = prepare_column(df, column)
+        histogram = bin_counts(prepared, bins)
+        # The figure only needs the KDE curves and the bin counts, not the sorted values.
+        tasks.append(ChartTask("histogram", column, {
+            "prepared": replace(prepared, sorted_values=[]), "histogram": histogram,
+        }))
+    timings["aggregate: histograms"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    cube = get_cube(key, df)
+    for dimension in cube.dimensions:
+        tasks.append(ChartTask("donut", dimension, {"counts": cube.counts_by(dimension), "dimension": dimension}))
+        counts = cube.crosstab(dimension) if has_target else cube.counts_by(dimension).to_frame("count")
+        tasks.append(ChartTask("countplot", dimension, {"crosstab": counts, "dimension": dimension}))
+    timings["aggregate: group cube"] = time.perf_counter() - started
+    return tasks
+
+
+def render_charts(tasks, workers=None, progress=None):
+    """Render ``tasks`` in a pool of ``workers`` processes (0 renders in this process)."""
+    if workers is None:
+        workers = min(len(tasks), os.cpu_count() or 1)
+    if workers == 0 or not tasks:
+        charts = []
+        for done, task in enumerate(tasks, start=1):
+            charts.append(render_chart(task))
+            if progress is not None:
+                progress(done / len(tasks))
+        return charts
+
+    pool = start_process_pool(workers, _init_worker)
+    try:
+        futures = [pool.submit(render_chart, task) for task in tasks]
+        charts = []
+        for done, future in enumerate(futures, start=1):
+            charts.append(future.result())
+            if progress is not None:
+                progress(done / len(tasks))
+        return charts
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script>{plotly_js}</script>
+<style>
+    body {{ background: #0D1117; color: #E6EDF3; font-family: sans-serif; margin: 0 auto; max-width: 1280px; padding: 20px; }}
+    .header {{ background: linear-gradient(135deg, #FF6B6B 0%, #FF8E72 100%); padding: 30px 20px; border-radius: 15px; }}
+    .header h1 {{ color: white; margin: 0; }}
+    .header p {{ color: rgba(255, 255, 255, 0.9); margin: 10px 0 0 0; }}
+    .chart {{ background: #161B22; border: 1px solid #30363D; border-radius: 12px; margin: 20px 0; padding: 20px; }}
+    .chart img {{ max-width: 100%; }}
+    .note, footer {{ color: #8B949E; font-size: 0.9em; }}
+    footer table {{ border-collapse: collapse; }}
+    footer td {{ padding: 2px 12px 2px 0; }}
+</style>
+</head>
+<body>
+<div class="header">
+    <h1>{title}</h1>
+    <p>{subtitle}</p>
+</div>
+{sections}
+<footer>
+<h3>Build timings</h3>
+<table>
+{timings}
+</table>
+</footer>
+</body>
+</html>
+"""
+
+
+def _chart_html(chart, index):
+    figure = chart.figure
+    note = f'<p class="note">{html.escape(figure.note)}</p>' if figure.note else ""
+    if figure.kind == PLOTLY:
+        # "</" would end the inline script early.
+        spec = figure.payload.decode("utf-8").replace("</", "<\\/")
+        body = (
+            f'<div id="chart-{index}"></div>\n'
+            f'<script>(function () {{ var fig = {spec}; '
+            f'Plotly.newPlot("chart-{index}", fig.data, fig.layout, {{responsive: true}}); }})();</script>'
+        )
+    else:
+        encoded = base64.b64encode(figure.payload).decode("ascii")
+        body = f'<img src="data:image/png;base64,{encoded}" alt="{html.escape(chart.title)}">'
+    return f'<div class="chart">\n<h3>{html.escape(chart.title)}</h3>\n{note}\n{body}\n</div>'
+
+
+def chart_sections(charts):
+    """Return the HTML of every chart, grouped into one section per chart type."""
+    sections = []
+    index = itertools.count()
+    for kind, heading in SECTIONS.items():
+        members = [chart for chart in charts if chart.kind == kind]
+        if members:
+            sections.append(f"<h2>{heading}</h2>")
+            sections.extend(_chart_html(chart, next(index)) for chart in members)
+    return "\n".join(sections)
+
+
+def assemble_report(sections, timings, title, subtitle):
+    """Return the report as one HTML string, with plotly.js inlined and ``timings`` in the footer."""
+    from plotly.offline import get_plotlyjs
+
+    rows = "\n".join(
+        f"<tr><td>{html.escape(stage)}</td><td>{seconds:,.2f}s</td></tr>" for stage, seconds in timings.items()
+    )
+    return _PAGE.format(
+        title=html.escape(title),
+        subtitle=html.escape(subtitle),
+        plotly_js=get_plotlyjs(),
+        sections=sections,
+        timings=rows,
+    )
+
+
+def build_report(df, columns=None, category=TARGET_COLUMN, bins=HISTOGRAM_BINS, workers=None, key=None,
+                 title="Loan Data Report", progress=None):
+    """Return ``(html, timings)`` for a report on ``columns`` of ``df``.
+
+    ``key`` is the dataset fingerprint, used to share the group cube with the
+    dashboard. ``progress`` is called with the fraction of charts rendered.
+    """
+    columns = list(columns or default_columns(df))
+    timings = {}
+    total_started = time.perf_counter()
+
+    tasks = plan_charts(df, columns, category, bins, key, timings)
+
+    started = time.perf_counter()
+    charts = render_charts(tasks, workers, progress)
+    timings["render: wall clock"] = time.perf_counter() - started
+    for kind in SECTIONS:
+        seconds = sum(chart.seconds for chart in charts if chart.kind == kind)
+        if seconds:
+            timings[f"render: {kind} (worker time)"] = seconds
+
+    started = time.perf_counter()
+    sections = chart_sections(charts)
+    timings["assemble"] = time.perf_counter() - started
+    timings["total"] = time.perf_counter() - total_started
+    subtitle = f"{len(df):,} rows · {len(charts)} charts · columns: {', '.join(columns)}"
+    return assemble_report(sections, timings, title, subtitle), timings
+
+
+def build_report_job(progress, df, **kwargs):
+    """``build_report`` for the job queue; the result is the UTF-8 encoded report."""
+    report, _ = build_report(df, progress=progress, **kwargs)
+    return report.encode("utf-8")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render every dashboard chart into one static HTML report.")
+    parser.add_argument("input", help="loan CSV file")
+    parser.add_argument("-o", "--output", default="report.html")
+    parser.add_argument("--columns", nargs="+", default=None, help="numeric columns to chart (default: all)")
+    parser.add_argument("--category", default=TARGET_COLUMN, help="category column of the violin plots")
+    parser.add_argument("--bins", type=int, default=HISTOGRAM_BINS)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="render processes (default: one per CPU, 0 renders in this process)")
+    args = parser.parse_args(argv)
+
+    from core.ingest import read_loan_csv
+
+    df = read_loan_csv(args.input)
+    report, timings = build_report(df, args.columns, args.category, args.bins, args.workers)
+    with open(args.output, "w", encoding="utf-8") as fh:
+        fh.write(report)
+    print(json.dumps({stage: round(seconds, 3) for stage, seconds in timings.items()}, indent=2))
+
+
+if __name__ == "__main__":
+    # Run the importable module's main, so worker processes can unpickle
+    # ``core.report.render_chart`` rather than a ``__main__`` function.
+    from core.report import main
+
+    main()
@@ -0,0 +1,123 @@
+"""Single entry point for scoring applicants with the loan approval pipeline.
+
+The pipeline is run exactly once per call (``predict_proba``); the label is
+derived from the approval probability and a decision threshold instead of a
+second ``predict`` pass through the ColumnTransformer and every tree.
+"""
+import argparse
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from core.features import engineer_features
+from core.prediction_cache import row_keys
+
+DEFAULT_THRESHOLD = 0.5
+APPROVED = 1
+
+
+def validate_threshold(threshold):
+    """Return ``threshold`` as a float, raising ``ValueError`` unless 0 < threshold < 1."""
+    try:
+        threshold = float(threshold)
+    except (TypeError, ValueError):
+        raise ValueError(f"threshold must be a number, got {threshold!r}") from None
+    if not 0.0 < threshold < 1.0:
+        raise ValueError(f"threshold must be between 0 and 1 (exclusive), got {threshold}")
+    return threshold
+
+
+def threshold_arg(value):
+    """``argparse`` type for a decision threshold, checked by ``validate_threshold``."""
+    try:
+        return validate_threshold(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
+
+
+@dataclass(frozen=True)
+class ScoreResult:
+    """Scores for ``n`` rows, all as C-contiguous arrays.
+
+    ``labels`` is int8 of shape ``(n,)``, ``probabilities`` holds the
+    per-class probabilities with shape ``(n, 2)`` and ``confidence`` is the
+    probability of the predicted label, shape ``(n,)``.
+    """
+
+    labels: np.ndarray
+    probabilities: np.ndarray
+    confidence: np.ndarray
+    threshold: float = DEFAULT_THRESHOLD
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def approval_probability(self):
+        return self.probabilities[:, APPROVED]
+
+
+def score_features(model, features, threshold=DEFAULT_THRESHOLD, deduplicate=False, cache=None,
+                   model_key=None):
+    """Score an already engineered feature frame (see ``engineer_features``).
+
+    With ``deduplicate`` the model only sees distinct feature rows and the
+    results are scattered back to every original row. Passing a
+    ``PredictionCache`` (with ``model_key``, normally the model checksum)
+    implies de-duplication and skips rows scored before.
+    """
+    threshold = validate_threshold(threshold)
+    if deduplicate or cache is not None:
+        probabilities = _predict_unique(model, features, cache, model_key)
+    else:
+        probabilities = np.ascontiguousarray(model.predict_proba(features))
+    labels = (probabilities[:, APPROVED] >= threshold).astype(np.int8)
+    confidence = np.ascontiguousarray(probabilities[np.arange(len(labels)), labels])
+    return ScoreResult(labels, probabilities, confidence, threshold)
+
+
+def score_frame(model, df, threshold=DEFAULT_THRESHOLD, deduplicate=False, cache=None, model_key=None):
+    """Engineer features for the raw applicant rows in ``df`` and score them."""
+    return score_features(model, engineer_features(df), threshold, deduplicate, cache, model_key)
+
+
+def unique_rows(features):
+    """Return ``(first, inverse)`` so that ``features.iloc[first].iloc[inverse]`` equals ``features``.
+
+    Rows are grouped by a 64-bit row hash in linear time; the grouping is then
+    verified against the actual values and falls back to an exact sort-based
+    ``np.unique`` if two different rows ever share a hash.
+    """
+    matrix = features.to_numpy(dtype=np.float64)
+    hashes = pd.util.hash_pandas_object(features, index=False).to_numpy()
+    inverse, uniques = pd.factorize(hashes)
+    first = np.empty(len(uniques), dtype=np.intp)
+    # Writing in reverse leaves the first occurrence of every group in place.
+    first[inverse[::-1]] = np.arange(len(inverse) - 1, -1, -1)
+    rebuilt = matrix[first][inverse]
+    if not ((rebuilt == matrix) | (np.isnan(rebuilt) & np.isnan(matrix))).all():
+        _, first, inverse = np.unique(matrix, axis=0, return_index=True, return_inverse=True)
+    return first, inverse.ravel()
+
+
+def _predict_unique(model, features, cache, model_key):
+    if len(features) == 0:
+        return np.empty((0, 2), dtype=np.float32)
+    first, inverse = unique_rows(features)
+
+    if cache is None:
+        probabilities = model.predict_proba(features.iloc[first])
+        return np.ascontiguousarray(probabilities[inverse])
+
+    if model_key is None:
+        raise ValueError("model_key is required when a prediction cache is used")
+    keys = row_keys(features.to_numpy(dtype=np.float64)[first], model_key)
+    cached = cache.lookup(keys)
+    missing = np.array([row is None for row in cached])
+    if missing.any():
+        fresh = model.predict_proba(features.iloc[first[missing]])
+        cache.store([key for key, miss in zip(keys, missing) if miss], fresh)
+        fresh_rows = iter(fresh)
+        cached = [next(fresh_rows) if row is None else row for row in cached]
+    return np.ascontiguousarray(np.stack(cached)[inverse])
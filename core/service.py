@@ -0,0 +1,229 @@
+"""Local HTTP scoring service with dynamic micro-batching.
+
+Concurrent single-applicant requests are queued and gathered into
+micro-batches of at most ``max_batch_size`` rows, waiting no longer than
+``max_wait`` seconds for a batch to fill. Each micro-batch is scored with one
+vectorized ``score_frame`` call.
+
+Usage: python -m core.service [--port 8502] [--max-batch-size 64] [--max-wait-ms 5]
+
+Endpoints:
+    POST /score   {"income": ..., "credit_score": ..., "loan_amount": ...,
+                   "years_employed": ..., "points": ...}
+    GET  /stats   latency percentiles, throughput, batch sizes and cache hit rate
+    GET  /health
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from core.features import INPUT_COLUMNS
+from core.model_registry import get_registry, resolve_model_path
+from core.prediction_cache import get_prediction_cache
+from core.scoring import DEFAULT_THRESHOLD, threshold_arg, score_frame
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT = 0.005
+
+
+class ServiceStats:
+    """Rolling latency window plus lifetime request and batch counters."""
+
+    def __init__(self, window=10_000):
+        self._latencies = deque(maxlen=window)
+        self._batch_sizes = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.requests = 0
+        self.batches = 0
+
+    def record_batch(self, size):
+        with self._lock:
+            self.batches += 1
+            self._batch_sizes.append(size)
+
+    def record_request(self, latency):
+        with self._lock:
+            self.requests += 1
+            self._latencies.append(latency)
+
+    def snapshot(self):
+        with self._lock:
+            latencies = np.array(self._latencies)
+            batch_sizes = np.array(self._batch_sizes)
+            requests, batches = self.requests, self.batches
+        elapsed = time.monotonic() - self.started
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000 if len(latencies) else (0.0, 0.0)
+        return {
+            "requests": requests,
+            "batches": batches,
+            "uptime_seconds": round(elapsed, 3),
+            "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+            "latency_p50_ms": round(float(p50), 3),
+            "latency_p99_ms": round(float(p99), 3),
+            "mean_batch_size": round(float(batch_sizes.mean()), 2) if len(batch_sizes) else 0.0,
+        }
+
+
+class MicroBatcher:
+    """Gathers single-row requests and scores them in vectorized batches."""
+
+    def __init__(self, registry, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait=DEFAULT_MAX_WAIT,
+                 threshold=DEFAULT_THRESHOLD, stats=None, cache=None):
+        self.registry = registry
+        self.cache = cache
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.threshold = threshold
+        self.stats = stats or ServiceStats()
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, row):
+        """Queue one applicant (a dict of ``INPUT_COLUMNS``) and return a ``Future``."""
+        future = Future()
+        self._queue.put((row, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            rows = [row for row, _ in batch]
+            futures = [future for _, future in batch]
+            try:
+                snapshot = self.registry.get()
+                scores = score_frame(snapshot.model, pd.DataFrame(rows, columns=INPUT_COLUMNS), self.threshold,
+                                     cache=self.cache, model_key=snapshot.checksum)
+            except Exception as exc:
+                for future in futures:
+                    future.set_exception(exc)
+                continue
+            self.stats.record_batch(len(batch))
+            approval = scores.approval_probability
+            for i, future in enumerate(futures):
+                future.set_result({
+                    "label": int(scores.labels[i]),
+                    "decision": "approved" if scores.labels[i] == 1 else "rejected",
+                    "approval_probability": float(approval[i]),
+                    "confidence": float(scores.confidence[i]),
+                })
+
+
+def parse_applicant(payload):
+    if not isinstance(payload, dict):
+        raise ValueError("request body must be a JSON object")
+    missing = [col for col in INPUT_COLUMNS if col not in payload]
+    if missing:
+        raise ValueError(f"missing required fields: {', '.join(missing)}")
+    try:
+        return {col: float(payload[col]) for col in INPUT_COLUMNS}
+    except (TypeError, ValueError):
+        raise ValueError("all applicant fields must be numeric") from None
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    batcher = None
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok", "model_checksum": self.batcher.registry.get().checksum})
+        elif self.path == "/stats":
+            stats = self.batcher.stats.snapshot()
+            if self.batcher.cache is not None:
+                stats["cache"] = self.batcher.cache.stats()
+            self._send(200, stats)
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/score":
+            self._send(404, {"error": "not found"})
+            return
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            row = parse_applicant(json.loads(self.rfile.read(length) or b"null"))
+        except ValueError as exc:
+            self._send(400, {"error": str(exc)})
+            return
+        try:
+            result = self.batcher.submit(row).result()
+        except Exception as exc:
+            self._send(500, {"error": str(exc)})
+            return
+        self.batcher.stats.record_request(time.perf_counter() - start)
+        self._send(200, result)
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host, port, batcher):
+    handler = type("BoundScoringHandler", (ScoringHandler,), {"batcher": batcher})
+    server_class = type("ScoringServer", (ThreadingHTTPServer,), {
+        "daemon_threads": True,
+        # The default backlog of 5 drops connections when many clients start at once.
+        "request_queue_size": 128,
+    })
+    return server_class((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve loan approval scores over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--model", default=None,
+                        help="trained pipeline (.pkl) or compiled export (.npz); defaults to the newest of the two")
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT * 1000)
+    parser.add_argument("--threshold", type=threshold_arg, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--no-cache", action="store_true", help="disable the prediction cache")
+    args = parser.parse_args(argv)
+
+    registry = get_registry(args.model or resolve_model_path())
+    registry.get()
+    cache = None if args.no_cache else get_prediction_cache()
+    batcher = MicroBatcher(registry, args.max_batch_size, args.max_wait_ms / 1000, args.threshold, cache=cache)
+    server = make_server(args.host, args.port, batcher)
+    print(f"Scoring service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
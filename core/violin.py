@@ -0,0 +1,159 @@
+"""Violin plots drawn from server-side summaries instead of raw rows.
+
+For every category the values are reduced to a KDE curve on a fixed grid,
+the quartiles, Tukey whiskers and at most ``MAX_OUTLIERS`` outlier points.
+The figure is built from those summaries alone, so its size does not depend
+on the number of rows.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from core.kde import binned_kde
+
+VIOLIN_GRID_POINTS = 128
+MAX_CATEGORIES = 30
+MAX_OUTLIERS = 100
+VIOLIN_HALF_WIDTH = 0.4
+
+
+@dataclass(frozen=True)
+class ViolinSummary:
+    category: str
+    count: int
+    grid: np.ndarray
+    density: np.ndarray
+    q1: float
+    median: float
+    q3: float
+    lower_whisker: float
+    upper_whisker: float
+    outliers: np.ndarray
+
+
+def _capped(values, limit):
+    """Keep at most ``limit`` of the sorted ``values``, always including both extremes."""
+    if len(values) <= limit:
+        return values
+    return values[np.linspace(0, len(values) - 1, limit).round().astype(np.int64)]
+
+
+def _summarize(category, values, low, high, grid_points, max_outliers):
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    # Tukey whiskers end at the most extreme values within 1.5 IQR of the box.
+    lower_whisker = values[np.searchsorted(values, q1 - 1.5 * iqr, side="left")]
+    upper_whisker = values[np.searchsorted(values, q3 + 1.5 * iqr, side="right") - 1]
+    outliers = np.concatenate([values[values < lower_whisker], values[values > upper_whisker]])
+
+    grid, density = binned_kde(values, low, high, grid_points)
+    # Like the raw violin, the curve stops at the category's own minimum and maximum.
+    inside = (grid >= values[0]) & (grid <= values[-1])
+    return ViolinSummary(
+        category=str(category),
+        count=len(values),
+        grid=grid[inside],
+        density=density[inside],
+        q1=float(q1),
+        median=float(median),
+        q3=float(q3),
+        lower_whisker=float(lower_whisker),
+        upper_whisker=float(upper_whisker),
+        outliers=_capped(outliers, max_outliers),
+    )
+
+
+def violin_summaries(df, x, y, grid_points=VIOLIN_GRID_POINTS, max_categories=MAX_CATEGORIES,
+                     max_outliers=MAX_OUTLIERS):
+    """Summarize ``df[y]`` per category of ``df[x]``.
+
+    Only the ``max_categories`` most frequent categories are kept. Returns the
+    summaries in category order plus the number of categories left out.
+    """
+    values = df[y].to_numpy(dtype=np.float64, na_value=np.nan)
+    codes, categories = pd.factorize(df[x], sort=True)
+    valid = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+    if len(values) == 0:
+        return [], 0
+
+    counts = np.bincount(codes, minlength=len(categories))
+    kept = np.sort(np.argsort(-counts, kind="stable")[:max_categories])
+    kept = kept[counts[kept] > 0]
+
+    # One sort by (code, value) groups every category's values in ascending order.
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+    starts = np.searchsorted(codes, np.arange(len(categories) + 1))
+    low, high = float(values.min()), float(values.max())
+    summaries = [
+        _summarize(categories[k], values[starts[k]:starts[k + 1]], low, high, grid_points, max_outliers)
+        for k in kept
+    ]
+    return summaries, len(categories) - len(kept)
+
+
+def violin_figure(summaries, x, y, title=None, template="plotly_dark"):
+    """Plotly figure drawing each summary as a KDE outline with a box, whiskers and outliers."""
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    colors = px.colors.qualitative.Plotly
+    fig = go.Figure()
+    for position, summary in enumerate(summaries):
+        color = colors[position % len(colors)]
+        peak = summary.density.max() if len(summary.density) else 0.0
+        width = summary.density / peak * VIOLIN_HALF_WIDTH if peak > 0 else summary.density
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([position - width, (position + width)[::-1]]),
+            y=np.concatenate([summary.grid, summary.grid[::-1]]),
+            fill="toself",
+            mode="lines",
+            line=dict(color=color, width=1),
+            opacity=0.6,
+            name=summary.category,
+            legendgroup=summary.category,
+            hoverinfo="skip",
+        ))
+        box_half = VIOLIN_HALF_WIDTH / 6
+        fig.add_trace(go.Scatter(
+            x=[position - box_half, position + box_half, position + box_half, position - box_half, position - box_half,
+               None, position, position, None, position, position, None, position - box_half, position + box_half],
+            y=[summary.q1, summary.q1, summary.q3, summary.q3, summary.q1,
+               None, summary.lower_whisker, summary.q1, None, summary.q3, summary.upper_whisker,
+               None, summary.median, summary.median],
+            mode="lines",
+            line=dict(color="white", width=1.5),
+            legendgroup=summary.category,
+            showlegend=False,
+            hovertemplate=(
+                f"{x}: {summary.category}<br>n: {summary.count:,}<br>"
+                f"upper fence: {summary.upper_whisker:.4g}<br>q3: {summary.q3:.4g}<br>"
+                f"median: {summary.median:.4g}<br>q1: {summary.q1:.4g}<br>"
+                f"lower fence: {summary.lower_whisker:.4g}<extra></extra>"
+            ),
+        ))
+        if len(summary.outliers):
+            fig.add_trace(go.Scatter(
+                x=np.full(len(summary.outliers), position),
+                y=summary.outliers,
+                mode="markers",
+                marker=dict(color=color, size=4),
+                legendgroup=summary.category,
+                showlegend=False,
+                hovertemplate=f"{y}: %{{y}}<extra>outlier</extra>",
+            ))
+    fig.update_layout(
+        title=title,
+        template=template,
+        xaxis=dict(
+            title=x,
+            tickmode="array",
+            tickvals=list(range(len(summaries))),
+            ticktext=[summary.category for summary in summaries],
+        ),
+        yaxis_title=y,
+        legend_title=x,
+    )
+    return fig
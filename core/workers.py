@@ -0,0 +1,200 @@
+"""Process pool whose workers are started through an explicit entry point.
+
+``multiprocessing``'s spawn start method makes every child re-import its
+parent's ``__main__`` before it runs anything, and under Streamlit that is
+whichever page script happens to be running. ``WorkerPool`` instead launches
+``python -m core.workers`` with ``subprocess``: a fresh interpreter that only
+imports what the tasks it unpickles need. Tasks and results travel as
+length-prefixed pickles over the worker's stdin and stdout; the worker points
+its own stdout at stderr first, so stray prints cannot corrupt the stream.
+
+The pool implements the part of ``concurrent.futures.Executor`` the app uses:
+``submit`` returns a ``Future`` and ``shutdown`` optionally drains or cancels
+queued tasks.
+"""
+import os
+import pickle
+import queue
+import struct
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future
+
+# Directory holding the ``core`` package, put on the workers' import path.
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class BrokenWorkerPool(RuntimeError):
+    """A worker process exited or failed to initialise."""
+
+
+class WorkerPool:
+    """A fixed number of ``python -m core.workers`` processes fed from one task queue."""
+
+    def __init__(self, workers, initializer=None, initargs=()):
+        self.workers = max(1, int(workers))
+        self._tasks = queue.SimpleQueue()
+        self._shutdown = False
+        self._lock = threading.Lock()
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [_ROOT, env.get("PYTHONPATH")]))
+        self._processes = [
+            subprocess.Popen([sys.executable, "-m", "core.workers"], stdin=subprocess.PIPE,
+                             stdout=subprocess.PIPE, env=env)
+            for _ in range(self.workers)
+        ]
+        try:
+            # Initialise all workers concurrently, then wait for each to report back.
+            for process in self._processes:
+                _send(process, (initializer, initargs, {}))
+            for process in self._processes:
+                status, value = _receive(process)
+                if status != "ok":
+                    raise BrokenWorkerPool(f"worker failed to initialise: {value!r}") from value
+        except BaseException:
+            self._kill()
+            raise
+        self._threads = [
+            threading.Thread(target=self._serve, args=(process,), daemon=True) for process in self._processes
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            future = Future()
+            self._tasks.put((future, fn, args, kwargs))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        """Stop the workers once the queued tasks are done (or cancelled)."""
+        with self._lock:
+            if not self._shutdown:
+                self._shutdown = True
+                if cancel_futures:
+                    while True:
+                        try:
+                            self._tasks.get_nowait()[0].cancel()
+                        except queue.Empty:
+                            break
+                for _ in self._processes:
+                    self._tasks.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _serve(self, process):
+        try:
+            while True:
+                item = self._tasks.get()
+                if item is None:
+                    break
+                future, fn, args, kwargs = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    payload = pickle.dumps((fn, args, kwargs))
+                except Exception as exc:
+                    future.set_exception(exc)
+                    continue
+                try:
+                    _write_frame(process.stdin, payload)
+                    status, value = _receive(process)
+                except (OSError, EOFError, pickle.UnpicklingError):
+                    future.set_exception(BrokenWorkerPool(f"worker {process.pid} exited"))
+                    self._fail_queued()
+                    break
+                if status == "ok":
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+        finally:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+            process.wait()
+
+    def _fail_queued(self):
+        with self._lock:
+            self._shutdown = True
+            while True:
+                try:
+                    item = self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None and item[0].set_running_or_notify_cancel():
+                    item[0].set_exception(BrokenWorkerPool("worker pool is broken"))
+            # Let the other serving threads stop as well.
+            for _ in self._processes:
+                self._tasks.put(None)
+
+    def _kill(self):
+        for process in self._processes:
+            process.kill()
+            process.wait()
+
+
+_HEADER = struct.Struct("<Q")
+
+
+def _write_frame(stream, payload):
+    stream.write(_HEADER.pack(len(payload)) + payload)
+    stream.flush()
+
+
+def _read_frame(stream):
+    header = stream.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise EOFError
+    (size,) = _HEADER.unpack(header)
+    payload = stream.read(size)
+    if len(payload) < size:
+        raise EOFError
+    return payload
+
+
+def _send(process, message):
+    _write_frame(process.stdin, pickle.dumps(message))
+
+
+def _receive(process):
+    return pickle.loads(_read_frame(process.stdout))
+
+
+def _reply(channel, status, value):
+    try:
+        payload = pickle.dumps((status, value))
+    except Exception:
+        payload = pickle.dumps(("error", RuntimeError(repr(value))))
+    _write_frame(channel, payload)
+
+
+def main():
+    """Worker entry point: run the initializer, then tasks, until stdin closes."""
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    initialised = False
+    while True:
+        try:
+            frame = _read_frame(sys.stdin.buffer)
+        except EOFError:
+            return
+        try:
+            fn, args, kwargs = pickle.loads(frame)
+            # The first message is the initializer, which may be None.
+            result = fn(*args, **kwargs) if fn is not None else None
+        except BaseException as exc:
+            _reply(channel, "error", exc)
+            if not initialised:
+                return
+        else:
+            _reply(channel, "ok", result if initialised else os.getpid())
+        initialised = True
+
+
+if __name__ == "__main__":
+    main()
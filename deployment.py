@@ -1,9 +1,21 @@
+import os
+from functools import partial
+
 import pandas as pd
 import streamlit as st
-import seaborn as sns
-import plotly.express as px
-import os
-import io
+
+from core.batch import DEFAULT_CHUNK_SIZE
+from core.dataset_store import get_dataset_store
+from core.export import FORMATS as EXPORT_FORMATS, export_to_cache, get_export_cache
+from core.ingest import footprint_report, read_loan_csv
+from core.job_panel import job_progress, jobs_sidebar, session_owner
+from core.jobs import FAILED, get_job_queue
+from core.preview import PreviewQuery, get_preview_engine
+from core.quality import quality_report
+
+# Excel rows are written one by one in Python; smaller chunks keep progress and
+# cancellation responsive
+EXPORT_CHUNK_SIZES = {"xlsx": 10_000}
 
 # ==========================================
 # PAGE CONFIG & THEME
@@ -177,6 +189,10 @@ if "uploaded_file" not in st.session_state:
     st.session_state["uploaded_file"] = None
 if "uploaded_data" not in st.session_state:
     st.session_state["uploaded_data"] = None
+if "uploaded_fingerprint" not in st.session_state:
+    st.session_state["uploaded_fingerprint"] = None
+if "uploaded_dataset" not in st.session_state:
+    st.session_state["uploaded_dataset"] = None
 
 # ==========================================
 # HEADER
@@ -188,6 +204,9 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Batch scoring and exports of this session keep running in the background
+jobs_sidebar()
+
 # ==========================================
 # FILE UPLOAD SECTION
 # ==========================================
@@ -206,25 +225,53 @@ with col1:
 with col2:
     if st.session_state["uploaded_file"] is not None:
         if st.button("🔄 Clear Data", use_container_width=True):
+            if st.session_state["uploaded_dataset"] is not None:
+                st.session_state["uploaded_dataset"].release()
             st.session_state["uploaded_file"] = None
             st.session_state["uploaded_data"] = None
+            st.session_state["uploaded_fingerprint"] = None
+            st.session_state["uploaded_dataset"] = None
             st.rerun()
 
 # ==========================================
 # PROCESS & STORE UPLOADED FILE
 # ==========================================
 if uploaded_file is not None:
-    # Store file in session state for persistence across tabs
-    st.session_state["uploaded_file"] = uploaded_file
+    # Only lightweight metadata is kept per session: the parsed data lives once
+    # in the shared, memory-mapped dataset store
+    upload_info = {"name": uploaded_file.name, "id": getattr(uploaded_file, "file_id", uploaded_file.name)}
+    
+    @st.cache_data(show_spinner=False)
+    def load_footprint(fingerprint, _file_object, total_rows):
+        return footprint_report(_file_object, total_rows=total_rows)
     
-    # Load and cache data
     @st.cache_data(show_spinner=False)
-    def load_data(file_object):
-        return pd.read_csv(file_object)
+    def load_quality_report(fingerprint, _data):
+        return quality_report(_data)
     
     try:
-        data = load_data(uploaded_file)
+        handle = st.session_state["uploaded_dataset"]
+        if handle is None or st.session_state["uploaded_file"] != upload_info:
+            progress_bar = st.progress(0.0, text="Parsing file...")
+            handle = get_dataset_store().acquire(
+                uploaded_file,
+                lambda source: read_loan_csv(
+                    source,
+                    progress=lambda fraction: progress_bar.progress(fraction, text=f"Parsing file... {fraction:.0%}")
+                ),
+                name=uploaded_file.name
+            )
+            progress_bar.empty()
+            if st.session_state["uploaded_dataset"] is not None:
+                st.session_state["uploaded_dataset"].release()
+        
+        fingerprint = handle.key
+        data = handle.data
+        st.session_state["uploaded_file"] = upload_info
+        st.session_state["uploaded_dataset"] = handle
         st.session_state["uploaded_data"] = data
+        st.session_state["uploaded_fingerprint"] = fingerprint
+        report = load_quality_report(fingerprint, data)
         
         # Success message with file info
         st.markdown(f"""
@@ -233,6 +280,13 @@ if uploaded_file is not None:
         </div>
         """, unsafe_allow_html=True)
         
+        coerced_columns = data.attrs.get("coerced_columns", [])
+        if coerced_columns:
+            st.warning(
+                f"Some values did not match the expected types and were coerced in: {', '.join(coerced_columns)}. "
+                "Non-numeric values were read as missing; yes/no style targets were mapped to true/false."
+            )
+        
         # ==========================================
         # DATA OVERVIEW
         # ==========================================
@@ -243,31 +297,29 @@ if uploaded_file is not None:
         with overview_col1:
             st.markdown(f"""
             <div class="stat-box">
-                📈<br>{len(data)}<br><small>Total Rows</small>
+                📈<br>{report.rows}<br><small>Total Rows</small>
             </div>
             """, unsafe_allow_html=True)
         
         with overview_col2:
             st.markdown(f"""
             <div class="stat-box info">
-                🏛️<br>{len(data.columns)}<br><small>Columns</small>
+                🏛️<br>{report.columns}<br><small>Columns</small>
             </div>
             """, unsafe_allow_html=True)
         
         with overview_col3:
-            missing = data.isnull().sum().sum()
             st.markdown(f"""
             <div class="stat-box">
-                ⚠️<br>{missing}<br><small>Missing Values</small>
+                ⚠️<br>{report.missing_values}<br><small>Missing Values</small>
             </div>
             """, unsafe_allow_html=True)
         
         with overview_col4:
             if 'loan_approved' in data.columns:
-                approved = (data['loan_approved'] == 1).sum()
                 st.markdown(f"""
                 <div class="stat-box success">
-                    ✅<br>{approved}<br><small>Approved</small>
+                    ✅<br>{report.approved}<br><small>Approved</small>
                 </div>
                 """, unsafe_allow_html=True)
         
@@ -276,89 +328,168 @@ if uploaded_file is not None:
         # ==========================================
         st.markdown("### 📋 Data Preview")
         
-        preview_col1, preview_col2 = st.columns([2, 1])
+        # Filtering, sorting and paging run on the server; only the visible
+        # page is sent to the browser
+        preview_engine = get_preview_engine(fingerprint, data)
+        numeric_columns = list(report.describe.columns)
+        text_columns = [
+            column for column in data.columns
+            if column not in numeric_columns and not pd.api.types.is_bool_dtype(data[column])
+        ]
+        
+        with st.expander("🔎 Filter & sort", expanded=False):
+            range_filters = []
+            for column in st.multiselect("Range filters", options=numeric_columns):
+                low, high = float(report.describe.loc["min", column]), float(report.describe.loc["max", column])
+                if low < high:
+                    selected_low, selected_high = st.slider(column, min_value=low, max_value=high, value=(low, high))
+                    range_filters.append((column, selected_low, selected_high))
+            
+            text_col1, text_col2 = st.columns([1, 2])
+            with text_col1:
+                text_column = st.selectbox("Search in", options=text_columns) if text_columns else None
+            with text_col2:
+                search_text = st.text_input("Contains", value="", disabled=text_column is None)
+            
+            sort_col1, sort_col2 = st.columns([2, 1])
+            with sort_col1:
+                sort_by = st.selectbox("Sort by", options=["(file order)"] + list(data.columns))
+            with sort_col2:
+                descending = st.checkbox("Descending", value=False)
+        
+        preview_col1, preview_col2, preview_col3 = st.columns([1, 1, 1])
         
         with preview_col1:
-            n_rows = st.slider(
-                "Select number of rows to view",
-                min_value=5,
-                max_value=min(50, len(data)),
-                value=10,
-                step=1
-            )
+            page_size = st.selectbox("Rows per page", options=[25, 50, 100, 250], index=1)
         
-        with preview_col2:
+        with preview_col3:
             show_all_cols = st.checkbox("Show all columns", value=True)
         
-        if show_all_cols:
-            st.dataframe(
-                data.head(n_rows),
-                use_container_width=True,
-                height=400
-            )
-        else:
+        columns_to_show = None
+        if not show_all_cols:
             columns_to_show = st.multiselect(
                 "Select columns to display",
                 options=data.columns,
                 default=data.columns.tolist()[:5]
             )
-            st.dataframe(
-                data[columns_to_show].head(n_rows),
-                use_container_width=True,
-                height=400
+        
+        preview_query = PreviewQuery(
+            ranges=tuple(range_filters),
+            text=((text_column, search_text.strip()),) if text_column and search_text.strip() else (),
+            sort_by=None if sort_by == "(file order)" else sort_by,
+            ascending=not descending
+        )
+        matching_rows = len(preview_engine.filter(preview_query))
+        
+        with preview_col2:
+            page_number = st.number_input(
+                "Page",
+                min_value=1,
+                max_value=max(1, -(-matching_rows // page_size)),
+                value=1,
+                step=1
             )
         
+        preview_page = preview_engine.page(preview_query, page_number, page_size, columns=columns_to_show)
+        st.caption(
+            f"Rows {preview_page.first_row:,}–{preview_page.first_row + len(preview_page.frame) - 1:,} "
+            f"of {preview_page.total_rows:,} matching (page {preview_page.page} of {preview_page.pages})"
+            if preview_page.total_rows else "No rows match the current filters"
+        )
+        st.dataframe(
+            preview_page.frame,
+            use_container_width=True,
+            height=400
+        )
+        
         # ==========================================
         # DATA STATISTICS
         # ==========================================
         st.markdown("### 📈 Statistical Summary")
         
-        stats_tab1, stats_tab2 = st.tabs(["Numeric Statistics", "Data Types"])
+        stats_tab1, stats_tab2, stats_tab3, stats_tab4 = st.tabs(
+            ["Numeric Statistics", "Data Types", "Data Quality", "Memory Footprint"]
+        )
         
         with stats_tab1:
             st.dataframe(
-                data.describe(),
+                report.describe,
                 use_container_width=True
             )
         
         with stats_tab2:
-            dtype_summary = pd.DataFrame({
-                'Column': data.columns,
-                'Data Type': data.dtypes.astype(str),
-                'Non-Null Count': data.count(),
-                'Null Count': data.isnull().sum()
-            })
-            st.dataframe(dtype_summary, use_container_width=True, hide_index=True)
+            st.dataframe(report.dtype_summary, use_container_width=True, hide_index=True)
+        
+        with stats_tab3:
+            quality_col1, quality_col2 = st.columns(2)
+            with quality_col1:
+                st.metric("Duplicate rows", f"{report.duplicate_rows:,}")
+                st.markdown("**Out-of-range values**")
+                st.dataframe(report.out_of_range, use_container_width=True, hide_index=True)
+            with quality_col2:
+                st.metric("Missing cells", f"{report.missing_values:,}")
+                if len(report.class_balance):
+                    st.markdown("**Class balance**")
+                    balance = report.class_balance.rename("Count").to_frame()
+                    balance["Share"] = balance["Count"] / report.rows
+                    st.dataframe(balance.style.format({"Count": "{:,}", "Share": "{:.1%}"}), use_container_width=True)
+        
+        with stats_tab4:
+            footprint = load_footprint(fingerprint, uploaded_file, len(data))
+            saved = footprint.loc["TOTAL", "Saved"]
+            st.caption(
+                f"Estimated from the first rows of the file: the typed schema uses "
+                f"{footprint.loc['TOTAL', 'Schema bytes'] / 1e6:,.1f} MB instead of "
+                f"{footprint.loc['TOTAL', 'Default bytes'] / 1e6:,.1f} MB ({saved:.0%} less)"
+            )
+            st.dataframe(
+                footprint.style.format({"Default bytes": "{:,}", "Schema bytes": "{:,}", "Saved": "{:.0%}"}),
+                use_container_width=True
+            )
         
         # ==========================================
         # DOWNLOAD OPTION
         # ==========================================
         st.markdown("### 💾 Download Data")
         
-        col_download1, col_download2 = st.columns(2)
+        # Files are only written on request, in a background job, then served
+        # from the export cache for every later download of the same dataset
+        export_format = st.selectbox(
+            "Export format",
+            options=list(EXPORT_FORMATS),
+            format_func=lambda fmt: EXPORT_FORMATS[fmt].label
+        )
+        export_label = EXPORT_FORMATS[export_format].label
+        export_name = os.path.splitext(uploaded_file.name)[0]
+        export_jobs = st.session_state.setdefault("export_jobs", {})
+        export_job = get_job_queue().get(export_jobs.get((fingerprint, export_format)))
         
-        with col_download1:
-            csv = data.to_csv(index=False)
+        if get_export_cache().cached(fingerprint, export_format):
             st.download_button(
-                label="📥 Download as CSV",
-                data=csv,
-                file_name=f"processed_{uploaded_file.name}",
-                mime="text/csv",
-                use_container_width=True
-            )
-        
-        with col_download2:
-            excel_buffer = io.BytesIO()
-            with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                data.to_excel(writer, index=False)
-            excel_buffer.seek(0)
-            st.download_button(
-                label="📊 Download as Excel",
-                data=excel_buffer,
-                file_name=f"processed_{uploaded_file.name.replace('.csv', '.xlsx')}",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                label=f"📥 Download as {export_label}",
+                data=partial(get_export_cache().read, fingerprint, export_format, data),
+                file_name=f"processed_{export_name}.{EXPORT_FORMATS[export_format].extension}",
+                mime=EXPORT_FORMATS[export_format].mime,
                 use_container_width=True
             )
+        elif export_job is not None and not export_job.finished:
+            job_progress(export_job, key="export")
+        else:
+            if export_job is not None and export_job.state == FAILED:
+                st.error(f"❌ Export failed: {export_job.error}")
+            if st.button(f"⚙️ Prepare {export_label} export", use_container_width=True):
+                job = get_job_queue().submit(
+                    export_to_cache,
+                    fingerprint,
+                    export_format,
+                    data,
+                    chunk_size=EXPORT_CHUNK_SIZES.get(export_format, DEFAULT_CHUNK_SIZE),
+                    kind="export",
+                    label=f"{export_label} export of {uploaded_file.name}",
+                    owner=session_owner()
+                )
+                export_jobs[(fingerprint, export_format)] = job.id
+                st.rerun()
     
     except Exception as e:
         st.markdown(f"""
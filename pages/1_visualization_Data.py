@@ -1,9 +1,20 @@
-import pandas as pd
 import streamlit as st
-import plotly.express as px
-import seaborn as sns
-import os
-import matplotlib.pyplot as plt
+
+from core.cube import countplot_figure, donut_figure, get_cube
+from core.derived import with_groups
+from core.density import (
+    DENSITY, DENSITY_THRESHOLD, SVG, WEBGL, WEBGL_THRESHOLD, density_figure, render_mode, scatter_density
+)
+from core.figure_cache import PLOTLY, figure_key, get_figure_cache
+from core.histogram import bin_counts, histogram_figure, prepare_column
+from core.job_panel import job_progress, jobs_sidebar, session_owner
+from core.jobs import DONE, FAILED, get_job_queue
+from core.lazy_imports import lazy_import
+from core.report import build_report_job, default_columns
+from core.violin import violin_figure, violin_summaries
+
+# Plotting libraries are only imported when the first chart is drawn
+px = lazy_import("plotly.express")
 
 st.set_page_config(page_title="Data Visualization", layout="wide", page_icon="📊")
 
@@ -56,6 +67,9 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Batch scoring and exports of this session keep running in the background
+jobs_sidebar()
+
 # ==========================================
 # CHECK FOR UPLOADED DATA IN SESSION STATE
 # ==========================================
@@ -67,7 +81,6 @@ if "uploaded_data" not in st.session_state or st.session_state["uploaded_data"]
     """, unsafe_allow_html=True)
     st.stop()
 
-data = st.session_state["uploaded_data"]
 st.success("✅ Data loaded successfully from session!")
 
 # ==========================================
@@ -75,24 +88,46 @@ st.success("✅ Data loaded successfully from session!")
 # ==========================================
 st.markdown("### 🔧 Data Processing")
 
-# Create score groups for analysis
-bins = [300, 579, 669, 740, 850]
-labels = ['Poor', 'Fair', 'Good', 'Excellent']
-data['credit_score_group'] = pd.cut(data['credit_score'], bins=bins, labels=labels, include_lowest=True).astype(str)
-
-bins = [0, 35, 60, 100]
-labels = ['Poor', 'Fair', 'Excellent']
-data['points_score_group'] = pd.cut(data['points'], bins=bins, labels=labels, include_lowest=True).astype(str)
-
-bins = [30053.00, 61000.00, 91000.00, 120000.00, 150000.00]
-labels = ['Limited', 'Moderate', 'Solid', 'High']
-data['income_score_group'] = pd.cut(data['income'], bins=bins, labels=labels, include_lowest=True).astype(str)
+# Score groups are computed once per dataset as compact categoricals and
+# appended to a view of the shared upload, which itself is never modified
+fingerprint = st.session_state.get("uploaded_fingerprint")
+data = with_groups(fingerprint, st.session_state["uploaded_data"])
 
 st.info("✅ Data grouping complete - Ready for visualization")
 
 # ==========================================
 # VISUALIZATION TABS
 # ==========================================
+# Rendered charts are shared by every session viewing the same dataset, and
+# their data arrays are sent as the narrowest binary types that keep the picture
+figure_cache = get_figure_cache()
+
+
+def show_figure(entry):
+    if entry.note:
+        st.caption(entry.note)
+    if entry.kind == PLOTLY:
+        st.plotly_chart(entry.to_plotly(), use_container_width=True)
+    else:
+        st.image(entry.payload, use_container_width=True)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def load_scatter_density(fingerprint, x_axis, y_axis, _data):
+    return scatter_density(_data, x_axis, y_axis, weight_column='loan_approved')
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def load_violin_summaries(fingerprint, x_axis, y_axis, _data):
+    return violin_summaries(_data, x_axis, y_axis)
+
+
+# Kept as a shared resource so the sorted arrays are not copied on every rerun
+@st.cache_resource(show_spinner=False, max_entries=16)
+def load_histogram_column(fingerprint, column, _data):
+    return prepare_column(_data, column)
+
+
 tab1, tab2, tab3, tab4 = st.tabs(['📍 Scatter Plot', '🎻 Violin Plot', '📊 Histogram', '🍩 Donut & Countplot'])
 
 # ==========================================
@@ -103,7 +138,7 @@ with tab1:
     st.subheader("Scatter Plot Analysis")
     
     col1, col2, col3 = st.columns(3)
-    numeric_columns = data.select_dtypes(include=['int64', 'float64']).columns.tolist()
+    numeric_columns = data.select_dtypes(include='number').columns.tolist()
     
     with col1:
         x_axis = st.selectbox("Select X axis", options=numeric_columns, index=0, key='x')
@@ -112,8 +147,38 @@ with tab1:
     with col3:
         color_option = st.selectbox("Select color", options=data.columns, index=2, key='color')
     
-    if st.button('🎨 Visualize Scatter Plot', key='scatter_btn'):
-        try:
+    # Large uploads are aggregated on the server instead of sending every row
+    # to the browser; the mode can be forced either way
+    scatter_modes = {"Auto": render_mode(len(data)), "Points": WEBGL, "Density": DENSITY}
+    scatter_choice = st.radio(
+        "Rendering",
+        options=list(scatter_modes),
+        horizontal=True,
+        key='scatter_mode',
+        help=f"Auto draws a density grid above {DENSITY_THRESHOLD:,} rows and uses WebGL above {WEBGL_THRESHOLD:,}"
+    )
+    scatter_mode = scatter_modes[scatter_choice]
+    if scatter_choice == "Points" and len(data) <= WEBGL_THRESHOLD:
+        scatter_mode = SVG
+    
+    def render_scatter():
+        note = ""
+        if scatter_mode == DENSITY:
+            grid, sample = load_scatter_density(fingerprint, x_axis, y_axis, data)
+            fig = density_figure(
+                grid,
+                sample,
+                x_axis,
+                y_axis,
+                hover_columns=data.columns.tolist()[:5],
+                title=f"Scatter Plot: {y_axis} vs {x_axis}"
+            )
+            note = (
+                f"{len(data):,} rows aggregated into a {len(grid.x_centers)}×{len(grid.y_centers)} grid"
+                + (" coloured by approval rate" if 'loan_approved' in data.columns else "")
+                + f"; hover details come from {len(sample):,} rows sampled across all cells"
+            )
+        else:
             fig = px.scatter(
                 data, 
                 x=x_axis, 
@@ -122,14 +187,20 @@ with tab1:
                 title=f"Scatter Plot: {y_axis} vs {x_axis}",
                 hover_data=data.columns.tolist()[:5],
                 template="plotly_dark",
-                color_continuous_scale="Viridis"
-            )
-            fig.update_layout(
-                height=600,
-                font=dict(size=12),
-                hovermode='closest'
+                color_continuous_scale="Viridis",
+                render_mode=scatter_mode
             )
-            st.plotly_chart(fig, use_container_width=True)
+        fig.update_layout(
+            height=600,
+            font=dict(size=12),
+            hovermode='closest'
+        )
+        return fig, note
+    
+    if st.button('🎨 Visualize Scatter Plot', key='scatter_btn'):
+        try:
+            key = figure_key(fingerprint, "scatter", x=x_axis, y=y_axis, color=color_option, mode=scatter_mode)
+            show_figure(figure_cache.get_or_render(key, render_scatter))
         except Exception as e:
             st.error(f"Error creating scatter plot: {str(e)}")
     
@@ -143,28 +214,33 @@ with tab2:
     st.subheader("Violin Plot Analysis")
     
     col1, col2 = st.columns(2)
-    numeric_columns = data.select_dtypes(include=['int64', 'float64']).columns.tolist()
-    categorical_columns = data.select_dtypes(include=['object', 'category', 'bool']).columns.tolist()
+    numeric_columns = data.select_dtypes(include='number').columns.tolist()
+    categorical_columns = data.select_dtypes(include=['object', 'string', 'category', 'bool', 'boolean']).columns.tolist()
     
     with col1:
         x_axis = st.selectbox("Select X axis (categorical)", options=categorical_columns, index=0, key='x_violin')
     with col2:
         y_axis = st.selectbox("Select Y axis (numeric)", options=numeric_columns, index=0, key='y_violin')
     
+    def render_violin():
+        # Violins are drawn from per-category summaries, never from the raw rows
+        summaries, hidden_categories = load_violin_summaries(fingerprint, x_axis, y_axis, data)
+        fig = violin_figure(
+            summaries,
+            x_axis,
+            y_axis,
+            title=f"Violin Plot: {y_axis} by {x_axis}"
+        )
+        fig.update_layout(height=600)
+        note = ""
+        if hidden_categories:
+            note = f"Showing the {len(summaries)} most frequent categories; {hidden_categories:,} smaller ones are hidden"
+        return fig, note
+    
     if st.button('🎨 Visualize Violin Plot', key='violin_btn'):
         try:
-            fig = px.violin(
-                data, 
-                x=x_axis, 
-                y=y_axis, 
-                color=x_axis,
-                title=f"Violin Plot: {y_axis} by {x_axis}",
-                box=True, 
-                points="all",
-                template="plotly_dark"
-            )
-            fig.update_layout(height=600)
-            st.plotly_chart(fig, use_container_width=True)
+            key = figure_key(fingerprint, "violin", x=x_axis, y=y_axis)
+            show_figure(figure_cache.get_or_render(key, render_violin))
         except Exception as e:
             st.error(f"Error creating violin plot: {str(e)}")
     
@@ -178,47 +254,23 @@ with tab3:
     st.subheader("Histogram Distribution Analysis")
     
     col1, col2 = st.columns(2)
-    numeric_columns = data.select_dtypes(include=['int64', 'float64']).columns.tolist()
+    numeric_columns = data.select_dtypes(include='number').columns.tolist()
     
     with col1:
         hist_column = st.selectbox("Select column for Histogram", options=numeric_columns, index=0, key='hist_col')
     with col2:
         bins_count = st.slider("Number of bins", min_value=10, max_value=100, value=50, step=5)
     
+    def render_histogram():
+        # Sorted values and KDE curves are prepared once per column; the
+        # bins slider only re-counts them
+        prepared = load_histogram_column(fingerprint, hist_column, data)
+        return histogram_figure(prepared, bin_counts(prepared, bins_count))
+    
     if st.button('🎨 Visualize Histogram', key='hist_btn'):
         try:
-            fig, ax = plt.subplots(figsize=(12, 6))
-            fig.patch.set_facecolor('#0D1117')
-            ax.set_facecolor('#161B22')
-            
-            if 'loan_approved' in data.columns:
-                sns.histplot(
-                    data=data, 
-                    x=hist_column, 
-                    bins=bins_count, 
-                    kde=True,
-                    hue='loan_approved', 
-                    element="step", 
-                    palette="Set2",
-                    ax=ax
-                )
-            else:
-                sns.histplot(
-                    data=data, 
-                    x=hist_column, 
-                    bins=bins_count, 
-                    kde=True,
-                    element="step", 
-                    palette="Set2",
-                    ax=ax
-                )
-            
-            ax.set_title(f"Distribution of {hist_column}", fontsize=14, color='white', fontweight='bold')
-            ax.set_xlabel(hist_column, color='white')
-            ax.set_ylabel("Frequency", color='white')
-            ax.tick_params(colors='white')
-            
-            st.pyplot(fig, use_container_width=True)
+            key = figure_key(fingerprint, "histogram", column=hist_column, bins=bins_count)
+            show_figure(figure_cache.get_or_render(key, render_histogram))
         except Exception as e:
             st.error(f"Error creating histogram: {str(e)}")
     
@@ -239,60 +291,105 @@ with tab4:
     with col2:
         countplot_column = st.selectbox("Select column for Countplot", options=options, index=1, key='countplot_col')
     
+    # Counts come from the group cube, built in one pass per dataset
+    cube = get_cube(fingerprint, data)
+    
+    def render_donut():
+        return donut_figure(cube.counts_by(donut_column), donut_column)
+    
+    def render_countplot():
+        if 'loan_approved' in data.columns:
+            counts = cube.crosstab(countplot_column)
+        else:
+            counts = cube.counts_by(countplot_column).to_frame("count")
+        return countplot_figure(counts, countplot_column)
+    
     if st.button('🎨 Visualize Charts', key='donut_btn'):
         try:
             col_viz1, col_viz2 = st.columns(2)
             
             with col_viz1:
                 # Donut Chart
-                donut_data = data[donut_column].value_counts().reset_index()
-                donut_data.columns = [donut_column, 'count']
-                
-                fig1 = px.pie(
-                    donut_data, 
-                    names=donut_column, 
-                    values='count',
-                    title=f"Distribution of {donut_column}",
-                    hole=0.6,
-                    color_discrete_sequence=px.colors.qualitative.Set3,
-                    template="plotly_dark"
-                )
-                st.plotly_chart(fig1, use_container_width=True)
+                show_figure(figure_cache.get_or_render(figure_key(fingerprint, "donut", column=donut_column), render_donut))
             
             with col_viz2:
                 # Countplot
-                fig2, ax = plt.subplots(figsize=(10, 6))
-                fig2.patch.set_facecolor('#0D1117')
-                ax.set_facecolor('#161B22')
-                
-                if 'loan_approved' in data.columns:
-                    sns.countplot(
-                        data=data, 
-                        x=countplot_column, 
-                        hue='loan_approved', 
-                        palette="husl",
-                        ax=ax
-                    )
-                else:
-                    sns.countplot(
-                        data=data, 
-                        x=countplot_column,
-                        palette="husl",
-                        ax=ax
-                    )
-                
-                ax.set_title(f"Count Distribution: {countplot_column}", fontsize=14, color='white', fontweight='bold')
-                ax.set_xlabel(countplot_column, color='white')
-                ax.set_ylabel("Count", color='white')
-                ax.tick_params(colors='white')
-                
-                st.pyplot(fig2, use_container_width=True)
+                show_figure(figure_cache.get_or_render(
+                    figure_key(fingerprint, "countplot", column=countplot_column), render_countplot
+                ))
         
         except Exception as e:
             st.error(f"Error creating visualizations: {str(e)}")
     
+    # Drill-down: any combination of groups, narrowed by any selection of bands
+    st.markdown("#### 🔍 Approval Drill-down")
+    drill_by = st.multiselect("Group by", options=cube.dimensions, default=[donut_column], key='drill_by')
+    filter_columns = st.columns(len(cube.dimensions))
+    drill_filters = {}
+    for filter_column, dimension in zip(filter_columns, cube.dimensions):
+        with filter_column:
+            drill_filters[dimension] = st.multiselect(
+                f"Only {dimension}",
+                options=cube.labels[dimension],
+                key=f'drill_filter_{dimension}'
+            )
+    drill_table = cube.summary(drill_by, drill_filters)
+    st.dataframe(
+        drill_table.style.format({
+            "count": "{:,}",
+            "approved": "{:,}",
+            "rejected": "{:,}",
+            "approval_rate": "{:.1%}",
+            "loan_amount_total": "{:,.0f}",
+            "loan_amount_approved": "{:,.0f}",
+            "loan_amount_mean": "{:,.0f}"
+        }, na_rep="-"),
+        use_container_width=True
+    )
+    
     st.markdown("</div>", unsafe_allow_html=True)
 
+# ==========================================
+# STATIC REPORT
+# ==========================================
+st.markdown("### 📄 Static Report")
+
+# Every chart type for the chosen columns, rendered by worker processes in
+# the background into one self-contained HTML file
+upload = st.session_state["uploaded_data"]
+report_columns = st.multiselect(
+    "Columns to include",
+    options=default_columns(upload),
+    default=default_columns(upload),
+    key='report_columns'
+)
+report_job = get_job_queue().get(st.session_state.get("report_job"))
+
+if report_job is not None and report_job.state == DONE:
+    st.download_button(
+        label="📥 Download HTML report",
+        data=report_job.result,
+        file_name="loan_data_report.html",
+        mime="text/html"
+    )
+elif report_job is not None and not report_job.finished:
+    job_progress(report_job, key="report")
+elif report_job is not None and report_job.state == FAILED:
+    st.error(f"❌ Report failed: {report_job.error}")
+
+if st.button('📄 Build Report', key='report_btn', disabled=not report_columns or (report_job is not None and not report_job.finished)):
+    job = get_job_queue().submit(
+        build_report_job,
+        upload,
+        columns=report_columns,
+        key=fingerprint,
+        kind="report",
+        label=f"Report on {len(report_columns)} columns",
+        owner=session_owner()
+    )
+    st.session_state["report_job"] = job.id
+    st.rerun()
+
 # ==========================================
 # DATA INSIGHTS
 # ==========================================
@@ -310,3 +407,9 @@ with col_insight3:
     if 'loan_approved' in data.columns:
         approval_rate = (data['loan_approved'].sum() / len(data) * 100)
         st.metric("Approval Rate", f"{approval_rate:.1f}%", "of loans")
+
+cache_stats = figure_cache.stats()
+st.caption(
+    f"Figure cache: {cache_stats['entries']} charts, {cache_stats['bytes'] / 1e6:,.1f} MB | "
+    f"hit rate {cache_stats['hit_rate']:.0%} ({cache_stats['hits']} hits, {cache_stats['misses']} misses)"
+)
@@ -1,8 +1,19 @@
 import streamlit as st
 import pandas as pd
-import joblib
+import io
 import os
 
+from core.batch import DEFAULT_CHUNK_SIZE, remove_result_file, score_to_temp_file
+from core.dataset_cache import fingerprint
+from core.export import FORMATS as EXPORT_FORMATS, get_export_cache
+from core.features import INPUT_COLUMNS, engineer_features
+from core.job_panel import job_progress, jobs_sidebar, session_owner
+from core.jobs import CANCELLED, FAILED, get_job_queue
+from core.model_registry import get_registry, resolve_model_path
+from core.parallel import score_in_parallel
+from core.prediction_cache import get_prediction_cache
+from core.scoring import DEFAULT_THRESHOLD, score_features
+
 st.set_page_config(page_title="Loan Prediction", layout="wide", page_icon="🔮")
 
 # Modern Theme CSS
@@ -78,23 +89,39 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Batch scoring and exports of this session keep running in the background
+jobs_sidebar()
+
 # ===============================
 # CHECK FOR DATA & LOAD MODEL
 # ===============================
+# The registry is shared by every session in this server process: the pipeline
+# is unpickled and warmed up once, and swapped in place when the file changes.
 try:
-    model = joblib.load("loan_approval_pipeline.pkl")
-    
+    model_snapshot = get_registry(resolve_model_path()).get()
+    model = model_snapshot.model
     model_loaded = True
-except:
+except Exception:
     model_loaded = False
-    st.error("❌ Model files not found. Please ensure 'loan_approval_model.pkl' and 'scaler.pkl' exist.")
+    st.error("❌ Model file not found. Please ensure 'loan_approval_pipeline.pkl' exists.")
 
 # ===============================
 # PREDICTION MODE SELECTION
 # ===============================
 st.markdown("### 📋 Prediction Mode")
 
-pred_mode = st.radio("Choose prediction mode:", ["Single Prediction"], horizontal=True)
+col1, col2 = st.columns([2, 1])
+with col1:
+    pred_mode = st.radio("Choose prediction mode:", ["Single Prediction", "Batch Prediction"], horizontal=True)
+with col2:
+    threshold = st.slider(
+        "Decision threshold",
+        min_value=0.05,
+        max_value=0.95,
+        value=DEFAULT_THRESHOLD,
+        step=0.05,
+        help="Approval probability at or above which a loan is approved"
+    )
 
 if pred_mode == "Single Prediction":
     # ===============================
@@ -163,37 +190,6 @@ if pred_mode == "Single Prediction":
     
     st.markdown("</div>", unsafe_allow_html=True)
     
-    # ===============================
-    # FEATURE ENGINEERING FUNCTIONS
-    # ===============================
-    def create_income_group(x):
-        if x < 61000:
-            return 0
-        elif x < 91000:
-            return 1
-        elif x < 120000:
-            return 2
-        else:
-            return 3
-    
-    def create_credit_group(x):
-        if x < 579:
-            return 0
-        elif x < 669:
-            return 1
-        elif x < 740:
-            return 2
-        else:
-            return 3
-    
-    def create_points_group(x):
-        if x < 30:
-            return 0
-        elif x < 65:
-            return 1
-        else:
-            return 2
-    
     # ===============================
     # PREDICT BUTTON
     # ===============================
@@ -211,29 +207,17 @@ if pred_mode == "Single Prediction":
             "points": points
         }])
         
-        # Apply Feature Engineering
-        df["income_score_group"] = df["income"].apply(create_income_group)
-        df["credit_score_group"] = df["credit_score"].apply(create_credit_group)
-        df["points_score_group"] = df["points"].apply(create_points_group)
-        
-        # IMPORTANT: same column order used during model training
-        df_final = df[[
-            "income",
-            "credit_score",
-            "loan_amount",
-            "years_employed",
-            "points",
-            "credit_score_group",
-            "points_score_group",
-            "income_score_group",
-        ]]
-        
-        # Scaling
-        #scaled_data = scaler.transform(df_final)
+        # Apply Feature Engineering (columns come back in training order)
+        df_final = engineer_features(df)
         
-        # Predict
-        prediction = model.predict(df_final)[0]
-        probability = model.predict_proba(df_final)[0]
+        # Predict (one pass through the pipeline, memoized per feature vector)
+        prediction_cache = get_prediction_cache()
+        scores = score_features(
+            model, df_final, threshold,
+            cache=prediction_cache, model_key=model_snapshot.checksum
+        )
+        prediction = scores.labels[0]
+        confidence = scores.confidence[0] * 100
         
         # ===============================
         # SHOW RESULTS
@@ -248,7 +232,6 @@ if pred_mode == "Single Prediction":
             </div>
             """, unsafe_allow_html=True)
             
-            confidence = max(probability) * 100
             st.success(f"Confidence Score: {confidence:.2f}%")
         else:
             st.markdown(f"""
@@ -258,7 +241,6 @@ if pred_mode == "Single Prediction":
             </div>
             """, unsafe_allow_html=True)
             
-            confidence = max(probability) * 100
             st.error(f"Confidence Score: {confidence:.2f}%")
         
         # Show detailed metrics
@@ -297,115 +279,147 @@ if pred_mode == "Single Prediction":
         # Processed data
         st.markdown("### 📋 Processed Features")
         st.dataframe(df_final, use_container_width=True, hide_index=True)
+        
+        cache_stats = prediction_cache.stats()
+        st.caption(
+            f"Prediction cache: {cache_stats['entries']} profiles | "
+            f"hit rate {cache_stats['hit_rate']:.0%} ({cache_stats['hits']} hits, {cache_stats['misses']} misses)"
+        )
 
 else:
     # ===============================
     # BATCH PREDICTION
     # ===============================
-    st.markdown("### 📦 Batch Prediction from Uploaded Data")
+    st.markdown("### 📦 Batch Prediction")
     
+    source_options = ["Upload a CSV file"]
     if "uploaded_data" in st.session_state and st.session_state["uploaded_data"] is not None:
-        data = st.session_state["uploaded_data"]
+        source_options.insert(0, "Data from main page")
+    
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        source_choice = st.radio("Data source:", source_options, horizontal=True)
+    with col2:
+        deduplicate = st.checkbox(
+            "De-duplicate rows",
+            value=True,
+            help="Score each distinct applicant profile once and copy the result to its duplicates"
+        )
+        workers = st.selectbox(
+            "Parallel workers",
+            options=[1, 2, 4, 8],
+            index=0,
+            help="Score each chunk on several CPU cores (capped at the cores other models' pools leave free); 1 keeps scoring in this process"
+        )
+        chunk_size = st.number_input(
+            "Rows per chunk",
+            min_value=1_000,
+            max_value=1_000_000,
+            value=DEFAULT_CHUNK_SIZE,
+            step=10_000,
+            help="Peak memory grows with the chunk size, not with the file size"
+        )
+    
+    # A CSV uploaded here is never parsed as a whole: it is streamed chunk by chunk
+    source = None
+    missing_cols = []
+    if source_choice == "Data from main page":
+        source = st.session_state["uploaded_data"]
+        missing_cols = [col for col in INPUT_COLUMNS if col not in source.columns]
+        if not missing_cols:
+            st.info(f"✅ Found {len(source)} records to predict")
+    else:
+        batch_file = st.file_uploader("Upload CSV for batch scoring", type=["csv"], key="batch_file")
+        if batch_file is not None:
+            header = pd.read_csv(batch_file, nrows=0).columns
+            batch_file.seek(0)
+            missing_cols = [col for col in INPUT_COLUMNS if col not in header]
+            source = batch_file
+    
+    if missing_cols:
+        st.warning(f"⚠️ Missing required columns: {', '.join(missing_cols)}")
+    elif source is not None and model_loaded:
+        if st.button("🚀 Predict for All Records", use_container_width=True):
+            if hasattr(source, "getvalue"):
+                # The uploaded file object belongs to the script run; give the job its own copy
+                source = io.BytesIO(source.getvalue())
+            
+            # Scoring runs in the background so it survives reruns and page switches;
+            # results go to a temporary file so they never sit in memory as a whole
+            # Worker processes are started once and reused by later batches; a
+            # parallel job leases its pool, so a pool replaced meanwhile outlives the job
+            if workers == 1:
+                job_args = (score_to_temp_file, model)
+            else:
+                job_args = (score_in_parallel, model_snapshot, workers)
+            job = get_job_queue().submit(
+                *job_args,
+                source,
+                chunk_size=int(chunk_size),
+                threshold=threshold,
+                deduplicate=deduplicate,
+                kind="batch",
+                label="Batch scoring",
+                owner=session_owner(),
+                cleanup=remove_result_file
+            )
+            st.session_state["batch_job"] = job.id
+    elif source is None:
+        st.info("📂 Upload a CSV file here or on the main page to use batch prediction")
+    
+    batch_job = get_job_queue().get(st.session_state.get("batch_job"))
+    if batch_job is not None and not batch_job.finished:
+        job_progress(batch_job, key="batch")
+    elif batch_job is not None and batch_job.state == FAILED:
+        st.error(f"❌ Batch scoring failed: {batch_job.error}")
+    elif batch_job is not None and batch_job.state == CANCELLED:
+        st.info("⏹ Batch scoring was cancelled")
+    elif batch_job is not None and os.path.exists(batch_job.result["path"]):
+        summary = batch_job.result["summary"]
         
-        # Check for required columns
-        required_cols = ["income", "credit_score", "loan_amount", "years_employed", "points"]
-        missing_cols = [col for col in required_cols if col not in data.columns]
+        # Show results
+        st.markdown("### 📊 Batch Prediction Results")
+        st.caption(f"Scored in {batch_job.elapsed:,.1f}s")
         
-        if not missing_cols and model_loaded:
-            st.info(f"✅ Found {len(data)} records to predict")
-            
-            if st.button("🚀 Predict for All Records", use_container_width=True):
-                # Feature engineering
-                df_batch = data[required_cols].copy()
-                
-                def create_income_group(x):
-                    if x < 61000:
-                        return 0
-                    elif x < 91000:
-                        return 1
-                    elif x < 120000:
-                        return 2
-                    else:
-                        return 3
-                
-                def create_credit_group(x):
-                    if x < 579:
-                        return 0
-                    elif x < 669:
-                        return 1
-                    elif x < 740:
-                        return 2
-                    else:
-                        return 3
-                
-                def create_points_group(x):
-                    if x < 30:
-                        return 0
-                    elif x < 65:
-                        return 1
-                    else:
-                        return 2
-                
-                df_batch["income_score_group"] = df_batch["income"].apply(create_income_group)
-                df_batch["credit_score_group"] = df_batch["credit_score"].apply(create_credit_group)
-                df_batch["points_score_group"] = df_batch["points"].apply(create_points_group)
-                
-                df_batch_final = df_batch[[
-                    "income",
-                    "credit_score",
-                    "loan_amount",
-                    "years_employed",
-                    "points",
-                    "credit_score_group",
-                    "points_score_group",
-                    "income_score_group",
-                ]]
-                
-                # Predict
-                
-                predictions = model.predict(df_batch_final)
-                probabilities = model.predict_proba(df_batch_final)
-                
-                # Add predictions to dataframe
-                result_df = data.copy()
-                result_df["prediction"] = predictions
-                result_df["prediction_text"] = result_df["prediction"].apply(
-                    lambda x: "✅ APPROVED" if x == 1 else "❌ REJECTED"
-                )
-                result_df["confidence"] = probabilities.max(axis=1) * 100
-                
-                # Show results
-                st.markdown("### 📊 Batch Prediction Results")
-                
-                # Summary stats
-                approved_count = (predictions == 1).sum()
-                rejected_count = (predictions == 0).sum()
-                
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Total Predictions", len(result_df))
-                with col2:
-                    st.metric("✅ Approved", approved_count)
-                with col3:
-                    st.metric("❌ Rejected", rejected_count)
-                
-                # Show detailed results
-                st.dataframe(
-                    result_df[["prediction_text", "confidence", "income", "credit_score", "loan_amount"]],
-                    use_container_width=True,
-                    hide_index=True
-                )
-                
-                # Download results
-                csv = result_df.to_csv(index=False)
-                st.download_button(
-                    label="📥 Download Predictions",
-                    data=csv,
-                    file_name="loan_predictions.csv",
-                    mime="text/csv"
-                )
+        # Summary stats
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Predictions", summary.rows)
+        with col2:
+            st.metric("✅ Approved", summary.approved)
+        with col3:
+            st.metric("❌ Rejected", summary.rejected)
+        
+        # Show detailed results (first rows only)
+        if summary.rows == 0:
+            st.info("The input has no rows, so there is nothing to show")
         else:
-            if missing_cols:
-                st.warning(f"⚠️ Missing required columns: {', '.join(missing_cols)}")
-    else:
-        st.info("📂 Please upload a CSV file from the main page to use batch prediction")
+            st.caption(f"Showing the first {len(summary.preview)} of {summary.rows} rows")
+            st.dataframe(
+                summary.preview[["prediction_text", "confidence", "income", "credit_score", "loan_amount"]],
+                use_container_width=True,
+                hide_index=True
+            )
+        
+        # Download results; other formats are converted from the results
+        # file chunk by chunk, only when the download is clicked
+        result_format = st.selectbox(
+            "Export format",
+            options=list(EXPORT_FORMATS),
+            format_func=lambda fmt: EXPORT_FORMATS[fmt].label,
+            key="batch_export_format"
+        )
+        result_path = batch_job.result["path"]
+        
+        def download_data(result_path=result_path, result_format=result_format):
+            if result_format == "csv":
+                with open(result_path, "rb") as result_file:
+                    return result_file.read()
+            return get_export_cache().read(fingerprint(result_path), result_format, result_path)
+        
+        st.download_button(
+            label="📥 Download Predictions",
+            data=download_data,
+            file_name=f"loan_predictions.{EXPORT_FORMATS[result_format].extension}",
+            mime=EXPORT_FORMATS[result_format].mime
+        )
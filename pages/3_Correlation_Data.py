@@ -0,0 +1,156 @@
+import time
+
+import streamlit as st
+
+from core.correlation import PEARSON, SPEARMAN, correlation_columns, correlation_matrix
+from core.figure_cache import PLOTLY, figure_key, get_figure_cache
+from core.job_panel import jobs_sidebar
+from core.lazy_imports import lazy_import
+
+# Plotly is only imported when the heatmap is drawn
+px = lazy_import("plotly.express")
+
+st.set_page_config(page_title="Correlation Analysis", layout="wide", page_icon="🧮")
+
+# Modern Theme CSS
+st.markdown("""
+<style>
+    .header-corr {
+        background: linear-gradient(135deg, #4FACFE 0%, #00F2FE 100%);
+        padding: 30px 20px;
+        border-radius: 15px;
+        margin-bottom: 30px;
+        box-shadow: 0 4px 15px rgba(79, 172, 254, 0.3);
+    }
+    
+    .header-corr h1 {
+        color: white;
+        font-size: 2.2em;
+        margin: 0;
+        font-weight: 700;
+    }
+    
+    .header-corr p {
+        color: rgba(255, 255, 255, 0.9);
+        margin: 10px 0 0 0;
+    }
+    
+    .info-alert {
+        background: rgba(79, 172, 254, 0.1);
+        border-left: 4px solid #4FACFE;
+        padding: 15px;
+        border-radius: 8px;
+        color: #4FACFE;
+        margin: 15px 0;
+    }
+</style>
+""", unsafe_allow_html=True)
+
+st.markdown("""
+<div class="header-corr">
+    <h1>🧮 Correlation Analysis</h1>
+    <p>How the numeric features of your loan data move together</p>
+</div>
+""", unsafe_allow_html=True)
+
+# Batch scoring and exports of this session keep running in the background
+jobs_sidebar()
+
+# ==========================================
+# CHECK FOR UPLOADED DATA IN SESSION STATE
+# ==========================================
+if "uploaded_data" not in st.session_state or st.session_state["uploaded_data"] is None:
+    st.markdown("""
+    <div class="info-alert">
+        ⬆️ Please upload a CSV file from the <strong>main page</strong> first.
+    </div>
+    """, unsafe_allow_html=True)
+    st.stop()
+
+fingerprint = st.session_state.get("uploaded_fingerprint")
+data = st.session_state["uploaded_data"]
+numeric_columns = correlation_columns(data)
+
+if len(numeric_columns) < 2:
+    st.warning("⚠️ At least two numeric columns are needed for a correlation matrix.")
+    st.stop()
+
+# ==========================================
+# CORRELATION SETTINGS
+# ==========================================
+methods = {"Pearson": PEARSON, "Spearman (rank)": SPEARMAN}
+
+col1, col2 = st.columns(2)
+with col1:
+    method_label = st.radio(
+        "Method",
+        options=list(methods),
+        horizontal=True,
+        key='corr_method',
+        help=("Spearman correlates the ranks of the values, so it also picks up monotonic non-linear "
+              "relationships. Missing values are dropped per pair of columns, and the selected columns "
+              "are loaded into memory whole to rank them.")
+    )
+with col2:
+    columns = st.multiselect("Columns", options=numeric_columns, default=numeric_columns, key='corr_columns')
+
+method = methods[method_label]
+
+
+# The matrix is accumulated chunk by chunk and kept per dataset, method and
+# column selection, so switching back and forth never rescans the rows
+@st.cache_data(show_spinner=False, max_entries=16)
+def load_correlation(fingerprint, method, columns, _data):
+    started = time.perf_counter()
+    matrix, rows = correlation_matrix(_data, method=method, columns=list(columns))
+    return matrix, rows, time.perf_counter() - started
+
+
+def render_heatmap(matrix, rows, seconds):
+    fig = px.imshow(
+        matrix,
+        text_auto=".2f",
+        zmin=-1,
+        zmax=1,
+        color_continuous_scale="RdBu",
+        aspect="auto",
+        title=f"{method_label} Correlation Matrix",
+        template="plotly_dark"
+    )
+    fig.update_layout(height=max(500, 60 * len(matrix)), font=dict(size=12))
+    return fig, f"Computed from {rows:,} rows in {seconds:.2f}s"
+
+
+# ==========================================
+# HEATMAP
+# ==========================================
+if len(columns) < 2:
+    st.info("Select at least two columns.")
+    st.stop()
+
+with st.spinner("Computing correlations..."):
+    matrix, rows, seconds = load_correlation(fingerprint, method, tuple(columns), data)
+
+figure_cache = get_figure_cache()
+entry = figure_cache.get_or_render(
+    figure_key(fingerprint, "correlation", method=method, columns=columns),
+    lambda: render_heatmap(matrix, rows, seconds)
+)
+st.caption(entry.note)
+if entry.kind == PLOTLY:
+    st.plotly_chart(entry.to_plotly(), use_container_width=True)
+
+# ==========================================
+# STRONGEST RELATIONSHIPS
+# ==========================================
+st.markdown("### 🔗 Strongest Relationships")
+
+pairs = matrix.stack().dropna()
+pairs = pairs[[a < b for a, b in pairs.index]]
+strongest = pairs.reindex(pairs.abs().sort_values(ascending=False).index).head(10)
+st.dataframe(
+    strongest.rename("correlation").rename_axis(["feature", "other feature"]).reset_index().style.format(
+        {"correlation": "{:+.3f}"}
+    ),
+    use_container_width=True
+)